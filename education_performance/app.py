@@ -1,22 +1,23 @@
-from flask import Flask, render_template, redirect, url_for, flash, request
+from flask import Flask, render_template, redirect, url_for, flash, request, jsonify, stream_with_context
 import os
-from flask_pymongo import PyMongo
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-import plotly.express as px
-import plotly.utils
-import json
 from forms import LoginForm, RegistrationForm
 from flask_migrate import Migrate
-import pandas as pd
-from config import MongoDBConfig, PostgresConfig
 from models import User, EducationData
-from extensions import db
-from etl import ETL
+from extensions import db, mongo, backends, chart_cache, jobs, user_cache, password_hasher
+from backends import BackendUnavailable
+from passwords import HasherBusy
+from jobs import JobAlreadyRunning
+from etl import ETL, CHUNK_SIZE
+from charts import CHARTS_BY_ID, charts_for_role, render_chart, chart_payload, shared_layout_json
+from repository import get_repository, records
+from rollups import rebuild_rollups
+from exports import csv_chunks, parquet_chunks
+from responses import json_response
 import logging
 from logging.handlers import RotatingFileHandler
 
 app = Flask(__name__)
-mongo=PyMongo()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 file_handler = RotatingFileHandler('education_etl.log', maxBytes=10000, backupCount=1)
@@ -30,8 +31,15 @@ console_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s: %(mes
 logger.addHandler(console_handler)
 
 app = Flask(__name__)
-app.config.from_object('config.MySQLConfig')  
+app.config.from_object(os.environ.get('APP_CONFIG', 'config.MySQLConfig'))
 db.init_app(app)
+backends.init_app(app, db)
+if app.config.get('MONGO_URI'):
+    mongo.init_app(app)
+chart_cache.init_app(app)
+jobs.init_app(app)
+user_cache.init_app(app)
+password_hasher.init_app(app)
 migrate = Migrate(app, db)
 
 login_manager = LoginManager()
@@ -42,9 +50,15 @@ login_manager.login_view = 'login'
 
 
 
+def cached(key, build, *args):
+    # Backends hold different data, so each gets its own cache entries.
+    return chart_cache.get_or_set(f'{backends.current(db.session)}-{key}', build, *args)
+
 @login_manager.user_loader
 def load_user(id):
-    return User.query.get(int(id))
+    # Each backend numbers its users independently.
+    key = (backends.current(db.session), int(id))
+    return user_cache.get_or_load(key, lambda key: db.session.get(User, key[1]))
 
 @app.route('/')
 @login_required
@@ -56,7 +70,16 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(username=form.username.data).first()
-        if user and user.check_password(form.password.data):
+        try:
+            valid = user is not None and user.check_password(form.password.data)
+            if valid and user.password_needs_rehash():
+                # PASSWORD_HASH_METHOD changed since this hash was made.
+                user.set_password(form.password.data)
+                db.session.commit()
+        except HasherBusy:
+            flash('Too many sign-in attempts right now, please try again shortly')
+            return render_template('login.html', form=form), 503
+        if valid:
             login_user(user)
             if user.role=='admin':
                 return redirect(url_for('admin_portal'))
@@ -73,7 +96,11 @@ def register():
             email=form.email.data,
             role=form.role.data
         )
-        user.set_password(form.password.data)
+        try:
+            user.set_password(form.password.data)
+        except HasherBusy:
+            flash('Too many requests right now, please try again shortly')
+            return render_template('register.html', form=form), 503
         db.session.add(user)
         db.session.commit()
         flash('Registration successful')
@@ -83,76 +110,36 @@ def register():
 @app.route('/dashboard',methods=['POST','GET'])
 @login_required
 def dashboard():
-    data = EducationData.query.all()
-    df = pd.DataFrame([{
-        'hours_studied': d.hours_studied,
-        'attendance': d.attendance,
-        'sleep_hours': d.sleep_hours,
-        'physical_activity': d.physical_activity,
-        'learning_disabilities': d.learning_disabilities,
-        'parental_involvement': d.parental_involvement,
-        'parental_education_level': d.parental_education_level,
-        'distance_from_home': d.distance_from_home,
-        'peer_influence': d.peer_influence,
-        'exam_score': d.exam_score
-    } for d in data])
-
-    charts = []
-    
-    fig1 = px.bar(df.groupby('hours_studied').exam_score.mean().reset_index(),
-                  x='hours_studied', y='exam_score',
-                  title='Hours Studied vs Average Exam Score')
-    charts.append(json.dumps(fig1, cls=plotly.utils.PlotlyJSONEncoder))
-    
-    fig2 = px.bar(df.groupby('attendance').exam_score.mean().reset_index(),
-                  x='attendance', y='exam_score',
-                  title='Attendance vs Average Exam Score')
-    charts.append(json.dumps(fig2, cls=plotly.utils.PlotlyJSONEncoder))
-    
-    fig3 = px.bar(df.groupby('sleep_hours').exam_score.mean().reset_index(),
-                  x='sleep_hours', y='exam_score',
-                  title='Sleep Hours vs Average Exam Score')
-    charts.append(json.dumps(fig3, cls=plotly.utils.PlotlyJSONEncoder))
-    
-    fig4 = px.bar(df.groupby('physical_activity').sleep_hours.mean().reset_index(),
-                  x='physical_activity', y='sleep_hours',
-                  title='Physical Activity vs Average Sleep Hours')
-    charts.append(json.dumps(fig4, cls=plotly.utils.PlotlyJSONEncoder))
-    
-    fig5 = px.bar(df.groupby('learning_disabilities').exam_score.mean().reset_index(),
-                  x='learning_disabilities', y='exam_score',
-                  title='Learning Disabilities vs Average Exam Score')
-    charts.append(json.dumps(fig5, cls=plotly.utils.PlotlyJSONEncoder))
-    
-    fig6 = px.bar(df.groupby('parental_involvement').exam_score.mean().reset_index(),
-                  x='parental_involvement', y='exam_score',
-                  title='Parental Involvement vs Average Exam Score')
-    charts.append(json.dumps(fig6, cls=plotly.utils.PlotlyJSONEncoder))
-    
-    fig7 = px.bar(df.groupby('parental_education_level').exam_score.mean().reset_index(),
-                  x='parental_education_level', y='exam_score',
-                  title='Parental Education Level vs Average Exam Score')
-    charts.append(json.dumps(fig7, cls=plotly.utils.PlotlyJSONEncoder))
-    
-    fig8 = px.bar(df.groupby('distance_from_home').exam_score.mean().reset_index(),
-                  x='distance_from_home', y='exam_score',
-                  title='Distance from Home vs Average Exam Score')
-    charts.append(json.dumps(fig8, cls=plotly.utils.PlotlyJSONEncoder))
-    
-    fig9 = px.bar(df.groupby('peer_influence').exam_score.mean().reset_index(),
-                  x='peer_influence', y='exam_score',
-                  title='Peer Influence vs Average Exam Score')
-    charts.append(json.dumps(fig9, cls=plotly.utils.PlotlyJSONEncoder))
-    
-    if current_user.role=='admin':
-        return render_template('dashboard.html', charts=charts)
-    elif current_user.role=='teacher':
-        return render_template('dashboard.html', charts=charts[:2])
-    elif current_user.role=='med_asst':
-        return render_template('dashboard.html', charts=charts[2:5])
-    elif current_user.role=='coordinator':
-        return render_template('dashboard.html', charts=charts[5:8])
-    return render_template('dashboard.html', charts=charts[8])
+    # Only the page shell: each chart is fetched from dashboard_chart, so
+    # the first byte never waits on a figure.
+    charts = [(chart, url_for('dashboard_chart', chart_id=chart.chart_id))
+              for chart in charts_for_role(current_user.role)]
+    return render_template('dashboard.html', charts=charts)
+
+def chart_request(chart_id):
+    """The chart a chart request asks for, or an error response."""
+    chart = CHARTS_BY_ID.get(chart_id)
+    if chart is None:
+        return None, (jsonify({'error': 'Unknown chart id'}), 404)
+    if chart not in charts_for_role(current_user.role):
+        return None, (jsonify({'error': 'Chart not available for your role'}), 403)
+    return chart, None
+
+@app.route('/dashboard/layout')
+@login_required
+def dashboard_layout():
+    # Fixed for the life of the process, so browsers may reuse it for a day.
+    return json_response(shared_layout_json(), max_age=86400)
+
+@app.route('/dashboard/charts/<chart_id>')
+@login_required
+def dashboard_chart(chart_id):
+    chart, error = chart_request(chart_id)
+    if error:
+        return error
+    payload = cached('chart-' + chart.chart_id, render_chart, chart)
+    return json_response(payload)
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     if 'file' not in request.files:
@@ -172,58 +159,121 @@ def upload_file():
     flash("File uploaded successfully.")
     return redirect(url_for('admin_portal'))
 
-@app.route('/etl', methods=['GET','POST'])
-def etl():
-    etl_process = ETL()
-
+def run_etl(job, force):
+    etl_process = ETL(max_workers=app.config.get('ETL_MAX_WORKERS'), force=force,
+                      progress=job.update, staging_dir=app.config.get('STAGING_DIR'))
     try:
-        logger.info("Starting ETL process")
-        data = etl_process.extract_data()
-        logger.debug(f"Extracted {len(data)} records")
+        logger.info(f"Starting ETL job {job.job_id}")
+        rows = etl_process.run(streaming=app.config.get('ETL_MODE') == 'streaming',
+                               chunksize=app.config.get('ETL_CHUNK_SIZE', CHUNK_SIZE))
+        logger.info(f"ETL job {job.job_id} completed successfully, loaded {rows} records")
+    except Exception as e:
+        logger.error(f"ETL job {job.job_id} failed: {e}")
+        raise
 
-        transformed_data = etl_process.transformation(data)
-        logger.debug(f"Transformed {len(transformed_data)} records")
+def wants_json():
+    return request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
 
-        etl_process.load_data(transformed_data)
-        logger.debug("ETL process completed successfully")
-        flash("ETL process completed successfully.")
-    except Exception as e:
-        logger.error(f"ETL process failed: {e}")
-        flash(f"ETL process failed: {e}")
+@app.route('/etl', methods=['POST'])
+@login_required
+def etl():
+    if current_user.role != 'admin':
+        if wants_json():
+            return jsonify({'error': 'Permission denied'}), 403
+        flash('Permission denied')
+        return redirect(url_for('dashboard'))
+    try:
+        job = jobs.submit('etl', run_etl, request.values.get('full') == '1')
+        message, status = f"ETL job {job.job_id} started.", 202
+    except JobAlreadyRunning as e:
+        job = e.job
+        message, status = f"ETL job {job.job_id} is already running.", 409
+    logger.info(message)
 
+    if wants_json():
+        return jsonify(job.to_dict()), status
+    flash(message)
     return redirect(url_for('admin_portal'))
 
+@app.route('/etl/status/<job_id>')
+@login_required
+def etl_status(job_id):
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Permission denied'}), 403
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/charts')
+@login_required
+def api_charts():
+    return jsonify([{'chart_id': chart.chart_id, 'title': chart.title,
+                     'url': url_for('api_chart', chart_id=chart.chart_id)}
+                    for chart in charts_for_role(current_user.role)])
+
+@app.route('/api/charts/<chart_id>')
+@login_required
+def api_chart(chart_id):
+    chart, error = chart_request(chart_id)
+    if error:
+        return error
+    payload = cached('api-' + chart.chart_id, chart_payload, chart)
+    return json_response(payload)
+
+@app.route('/api/rows')
+@login_required
+def api_rows():
+    limit = max(min(request.args.get('limit', app.config['API_PAGE_SIZE'], type=int),
+                    app.config['API_PAGE_SIZE_MAX']), 1)
+    frames = get_repository().stream_rows(limit, after_id=request.args.get('after_id', 0, type=int),
+                                          limit=limit)
+    rows = records(next(frames))
+    frames.close()
+    next_after_id = rows[-1]['id'] if len(rows) == limit else None
+    return jsonify({'rows': rows, 'next_after_id': next_after_id})
+
+@app.route('/api/export.<fmt>')
+@login_required
+def api_export(fmt):
+    if fmt not in ('csv', 'parquet'):
+        return jsonify({'error': 'Unsupported export format'}), 404
+    frames = get_repository().stream_rows(app.config['EXPORT_BATCH_SIZE'])
+    if fmt == 'csv':
+        body, mimetype = csv_chunks(frames), 'text/csv'
+    else:
+        body, mimetype = parquet_chunks(frames, EducationData.__table__), 'application/vnd.apache.parquet'
+    return app.response_class(stream_with_context(body), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=education_data.{fmt}'})
+
 @app.route('/admin_portal')
 def admin_portal():
     return render_template('admin.html')
 
 
-@app.route('/switch_database')
 @app.route('/switch_database')
 @login_required
 def switch_database():
     if current_user.role != 'admin':
         flash('Permission denied')
         return redirect(url_for('dashboard'))
-    
-    current_db = 'mongo' if 'MONGO_URI' in app.config else 'postgresql'
-    
-    if current_db == 'postgresql':
-        app.config.from_object(MongoDBConfig)
-        mongo.init_app(app)
-        db.session.remove()
-        db.dispose() 
-        db = None 
-        flash('Switched to MongoDB')
-    else:
-        app.config.from_object(PostgresConfig)
-        db.init_app(app)
-        flash('Switched to PostgreSQL')
-
+    # Requests already running finish on the backend they started with.
+    name = request.args.get('backend') or backends.next_backend()
+    try:
+        backends.switch(name)
+    except BackendUnavailable as e:
+        flash(str(e))
+        return redirect(url_for('dashboard'))
+    flash(f'Switched to {name}')
     return redirect(url_for('dashboard'))
 
-
-
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recompute the dashboard rollups from education_data."""
+    rebuild_rollups()
+    db.session.commit()
+    chart_cache.bump_version()
+    logger.info("Rollups rebuilt")
 
 @app.route('/logout')
 @login_required
@@ -0,0 +1,112 @@
+import logging
+import threading
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+
+logger = logging.getLogger(__name__)
+
+
+class BackendUnavailable(Exception):
+    pass
+
+
+class BackendRegistry:
+    """One engine and warmed pool per configured database, built at startup.
+
+    ``DATABASE_BACKENDS`` maps backend names to URLs; ``DATABASE_BACKEND``
+    names the one Flask-SQLAlchemy's own engine points at, which is reused
+    here. Switching only changes which engine new sessions bind to, so it
+    is instant and never drops a pool. A session binds on first use and
+    keeps that backend until it is removed at the end of the request or
+    job, so work never straddles two databases.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.default = None
+        self.active = None
+        self.unavailable = {}
+        self._engines = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.default = app.config.get('DATABASE_BACKEND', 'default')
+        self.active = self.default
+        with app.app_context():
+            self._engines[self.default] = db.engine
+        pool_options = app.config.get('DB_POOL_OPTIONS', {})
+        for name, url in app.config.get('DATABASE_BACKENDS', {}).items():
+            if name == self.default:
+                continue
+            try:
+                self._engines[name] = create_engine(
+                    url, **({} if url.startswith('sqlite') else pool_options))
+            except Exception as e:
+                # Usually a missing driver; the other backends still work.
+                self.unavailable[name] = str(e)
+                logger.warning(f"Database backend {name} not registered: {e}")
+        self.warm(app.config.get('DB_POOL_WARM', 2))
+        app.extensions['backends'] = self
+
+    def warm(self, connections):
+        """Open ``connections`` pooled connections per backend up front."""
+        for name, engine in list(self._engines.items()):
+            opened = []
+            try:
+                for _ in range(connections):
+                    opened.append(engine.connect())
+            except Exception as e:
+                if name != self.default:
+                    self.unavailable[name] = str(e)
+                logger.warning(f"Could not warm database backend {name}: {e}")
+            finally:
+                for connection in opened:
+                    connection.close()
+
+    @property
+    def names(self):
+        return list(self._engines)
+
+    def engine(self, name):
+        return self._engines[name]
+
+    def switch(self, name):
+        if name not in self._engines:
+            raise BackendUnavailable(self.unavailable.get(name) or f"Unknown database backend {name!r}")
+        if name in self.unavailable:
+            # It may have come up since startup; try it once more.
+            try:
+                self._engines[name].connect().close()
+            except Exception as e:
+                raise BackendUnavailable(f"Database backend {name} is unavailable: {e}") from None
+        with self._lock:
+            self.unavailable.pop(name, None)
+            self.active = name
+        logger.info(f"Switched database backend to {name}")
+        return name
+
+    def next_backend(self):
+        names = [name for name in self._engines if name not in self.unavailable]
+        if not names:
+            return self.active
+        position = names.index(self.active) if self.active in names else -1
+        return names[(position + 1) % len(names)]
+
+    def current(self, session):
+        """The backend ``session`` is bound to, binding it to the active one if new."""
+        name = session.info.get('backend')
+        if name is None:
+            name = session.info['backend'] = self.active
+        return name
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that binds to the registry's active backend."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        registry = current_app.extensions.get('backends')
+        if bind is not None or registry is None:
+            return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        return registry.engine(registry.current(self))
@@ -0,0 +1,100 @@
+"""Time the rollup GROUP BY queries on SQLite with and without indexes.
+
+    python bench_group_by.py --rows 1000000
+
+Builds a throwaway database of synthetic students, runs the per-dimension
+query rebuild_rollups issues against the bare table, adds the model's
+indexes and runs them again.
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from sqlalchemy import create_engine
+from models import EducationData
+from queries import group_by_statement
+from rollups import ROLLUP_DIMENSIONS
+
+LEVELS = {
+    'learning_disabilities': ['No', 'Yes'],
+    'parental_involvement': ['Low', 'Medium', 'High'],
+    'parental_education_level': ['High School', 'College', 'Postgraduate'],
+    'distance_from_home': ['Near', 'Moderate', 'Far'],
+    'peer_influence': ['Negative', 'Neutral', 'Positive'],
+}
+
+
+def fill(engine, rows, batch_size=100000):
+    table = EducationData.__table__
+    rng = np.random.default_rng(0)
+    with engine.begin() as connection:
+        for start in range(0, rows, batch_size):
+            n = min(batch_size, rows - start)
+            columns = {
+                'hours_studied': rng.integers(1, 45, n).astype(float),
+                'attendance': rng.integers(60, 101, n).astype(float),
+                'sleep_hours': rng.integers(4, 11, n).astype(float),
+                'physical_activity': rng.integers(0, 7, n).astype(str),
+                'exam_score': rng.integers(55, 101, n).astype(float),
+            }
+            for name, levels in LEVELS.items():
+                columns[name] = rng.choice(levels, n)
+            records = [dict(zip(columns, values)) for values in
+                       zip(*(column.tolist() for column in columns.values()))]
+            connection.execute(table.insert(), records)
+
+
+def time_rollups(engine, repeat):
+    timings = {}
+    with engine.connect() as connection:
+        for dimension in ROLLUP_DIMENSIONS:
+            stmt = group_by_statement(EducationData, dimension, [
+                ('count', 'id'),
+                ('sum', 'exam_score'),
+                ('sum', 'sleep_hours')
+            ])
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                connection.execute(stmt).all()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[dimension] = best
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    table = EducationData.__table__
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine('sqlite:///' + os.path.join(tmp, 'bench.db'))
+        table.create(engine)
+        for index in table.indexes:
+            index.drop(engine)
+        start = time.perf_counter()
+        fill(engine, args.rows)
+        print(f"loaded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        bare = time_rollups(engine, args.repeat)
+        start = time.perf_counter()
+        for index in table.indexes:
+            index.create(engine)
+        with engine.begin() as connection:
+            connection.exec_driver_sql('ANALYZE')
+        print(f"built {len(table.indexes)} indexes in {time.perf_counter() - start:.1f}s")
+        indexed = time_rollups(engine, args.repeat)
+
+        print(f"{'dimension':<28}{'no index ms':>14}{'indexed ms':>14}{'speedup':>10}")
+        for dimension in bare:
+            print(f"{dimension:<28}{bare[dimension] * 1000:>14.1f}{indexed[dimension] * 1000:>14.1f}"
+                  f"{bare[dimension] / indexed[dimension]:>9.1f}x")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
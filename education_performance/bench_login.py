@@ -0,0 +1,60 @@
+"""Measure password verifications per second for each hash method.
+
+    python bench_login.py --workers 4 --seconds 5
+    python bench_login.py --method pbkdf2:sha256:600000 --method scrypt:16384:8:1
+
+Verification is what a login costs the server, so this is an upper bound
+on logins/sec for a worker with PASSWORD_HASH_WORKERS set to --workers.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+from passwords import method_prefix
+
+METHODS = [
+    'scrypt:32768:8:1',
+    'scrypt:16384:8:1',
+    'pbkdf2:sha256:1000000',
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:260000',
+]
+
+
+def verify_for(pwhash, password, deadline):
+    count = 0
+    while time.perf_counter() < deadline:
+        check_password_hash(pwhash, password)
+        count += 1
+    return count
+
+
+def bench(method, workers, seconds):
+    pwhash = generate_password_hash('correct horse battery staple', method)
+    start = time.perf_counter()
+    single = check_password_hash(pwhash, 'correct horse battery staple')
+    latency = time.perf_counter() - start
+    assert single
+    deadline = time.perf_counter() + seconds
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        counts = list(pool.map(verify_for, [pwhash] * workers,
+                               ['correct horse battery staple'] * workers, [deadline] * workers))
+    return sum(counts) / seconds, latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--method', action='append', dest='methods')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    print(f"{'method':<26}{'latency ms':>12}{'logins/s':>12}{'per core':>12}")
+    for method in args.methods or METHODS:
+        rate, latency = bench(method, args.workers, args.seconds)
+        print(f"{method_prefix(method):<26}{latency * 1000:>12.1f}{rate:>12.1f}{rate / args.workers:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import io
+from sqlalchemy import Float, Integer, String
+from extensions import db
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+def coerce_to_table(chunk, table):
+    """Give each column the pandas type matching its column in ``table``.
+
+    Stores without a schema of their own keep whatever type they are
+    given, so this is what keeps them in step with the SQL table.
+    """
+    chunk = chunk.copy()
+    for name in chunk.columns:
+        column_type = table.c[name].type
+        kind = chunk[name].dtype.kind
+        if isinstance(column_type, Integer) and kind == 'f':
+            chunk[name] = chunk[name].astype('Int64')
+        elif isinstance(column_type, Float) and kind in 'biu':
+            chunk[name] = chunk[name].astype('Float64')
+        elif isinstance(column_type, String) and kind in 'biuf':
+            chunk[name] = chunk[name].astype('string')
+    return chunk
+
+
+def _records(chunk):
+    columns = list(chunk.columns)
+    values = [chunk[name].astype(object).where(chunk[name].notna(), None).tolist()
+              for name in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def _copy_chunk(connection, table, chunk):
+    buffer = io.StringIO()
+    chunk.to_csv(buffer, header=False, index=False, na_rep='')
+    buffer.seek(0)
+    columns = ', '.join(chunk.columns)
+    sql = f"COPY {table.name} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '')"
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):
+            cursor.copy_expert(sql, buffer)
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def bulk_insert(df, table, batch_size=DEFAULT_BATCH_SIZE):
+    """Stream ``df`` into ``table`` in chunks of ``batch_size`` rows.
+
+    Columns must already carry the table's column names. PostgreSQL gets one
+    ``COPY ... FROM STDIN`` per chunk; every other dialect gets a multi-row
+    ``executemany`` insert. Nothing is committed: the caller's transaction
+    also holds the manifest entries for the rows, so both land together.
+    """
+    total = 0
+    for start in range(0, len(df), batch_size):
+        chunk = coerce_to_table(df.iloc[start:start + batch_size], table)
+        connection = db.session.connection()
+        if connection.dialect.name == 'postgresql':
+            _copy_chunk(connection, table, chunk)
+        else:
+            connection.execute(table.insert(), _records(chunk))
+        total += len(chunk)
+    return total
@@ -0,0 +1,121 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class ChartCache:
+    """LRU cache of rendered chart JSON keyed by chart id and data version.
+
+    ETL bumps the data version after every load, which makes every cached
+    chart unreachable at once. With ``CHART_CACHE_DIR`` set, entries and the
+    version counter are also kept on disk, so they survive restarts and are
+    shared by every worker process pointed at the same directory. A process
+    deletes the file of every entry its LRU evicts, so the directory holds
+    at most ``CHART_CACHE_SIZE`` entries per worker.
+    """
+
+    def __init__(self, app=None):
+        self.max_entries = 64
+        self.cache_dir = None
+        self._entries = OrderedDict()
+        self._version = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('CHART_CACHE_SIZE', 64)
+        self.cache_dir = app.config.get('CHART_CACHE_DIR')
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        app.extensions['chart_cache'] = self
+
+    def _version_path(self):
+        return os.path.join(self.cache_dir, 'data_version')
+
+    def _entry_path(self, version, key):
+        return os.path.join(self.cache_dir, f'{version}-{key}.json')
+
+    def data_version(self):
+        if self.cache_dir:
+            try:
+                with open(self._version_path()) as f:
+                    return int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                return 0
+        return self._version
+
+    def bump_version(self):
+        with self._lock:
+            version = self.data_version() + 1
+            self._version = version
+            self._entries.clear()
+            if self.cache_dir:
+                _write_atomic(self._version_path(), str(version))
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith('.json') and not name.startswith(f'{version}-'):
+                        try:
+                            os.remove(os.path.join(self.cache_dir, name))
+                        except OSError:
+                            pass
+        return version
+
+    def get(self, key, version=None):
+        if version is None:
+            version = self.data_version()
+        with self._lock:
+            payload = self._entries.get((version, key))
+            if payload is not None:
+                self._entries.move_to_end((version, key))
+                return payload
+        if self.cache_dir:
+            try:
+                with open(self._entry_path(version, key)) as f:
+                    payload = f.read()
+            except OSError:
+                return None
+            self._store(version, key, payload)
+            return payload
+        return None
+
+    def set(self, key, payload, version=None):
+        if version is None:
+            version = self.data_version()
+        if self.cache_dir:
+            _write_atomic(self._entry_path(version, key), payload)
+        self._store(version, key, payload)
+        return payload
+
+    def get_or_set(self, key, build, *args):
+        # Read once: a load that commits while build() runs bumps the
+        # version, and the payload must not be filed under the new one.
+        version = self.data_version()
+        payload = self.get(key, version)
+        if payload is None:
+            payload = self.set(key, build(*args), version)
+        return payload
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, version, key, payload):
+        evicted = []
+        with self._lock:
+            self._entries[(version, key)] = payload
+            self._entries.move_to_end((version, key))
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+        if self.cache_dir:
+            for old_version, old_key in evicted:
+                try:
+                    os.remove(self._entry_path(old_version, old_key))
+                except OSError:
+                    pass
+
+
+def _write_atomic(path, text):
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,100 @@
+import base64
+import json
+import numpy as np
+import plotly.io as pio
+import plotly.utils
+from flask import current_app
+from repository import StagingRepository, get_repository
+from etl import ETL, SCHEMA
+
+
+class Chart:
+    def __init__(self, chart_id, title, group_by, metric):
+        self.chart_id = chart_id
+        self.title = title
+        self.group_by = group_by
+        self.metric = metric
+
+
+CHARTS = [
+    Chart('hours_studied', 'Hours Studied vs Average Exam Score', 'hours_studied', 'exam_score'),
+    Chart('attendance', 'Attendance vs Average Exam Score', 'attendance', 'exam_score'),
+    Chart('sleep_hours', 'Sleep Hours vs Average Exam Score', 'sleep_hours', 'exam_score'),
+    Chart('physical_activity', 'Physical Activity vs Average Sleep Hours', 'physical_activity', 'sleep_hours'),
+    Chart('learning_disabilities', 'Learning Disabilities vs Average Exam Score', 'learning_disabilities', 'exam_score'),
+    Chart('parental_involvement', 'Parental Involvement vs Average Exam Score', 'parental_involvement', 'exam_score'),
+    Chart('parental_education_level', 'Parental Education Level vs Average Exam Score', 'parental_education_level', 'exam_score'),
+    Chart('distance_from_home', 'Distance from Home vs Average Exam Score', 'distance_from_home', 'exam_score'),
+    Chart('peer_influence', 'Peer Influence vs Average Exam Score', 'peer_influence', 'exam_score'),
+]
+CHARTS_BY_ID = {chart.chart_id: chart for chart in CHARTS}
+# Chart ids each role may see; unknown roles get the viewer's.
+ROLE_CHARTS = {
+    'admin': [chart.chart_id for chart in CHARTS],
+    'teacher': ['hours_studied', 'attendance'],
+    'med_asst': ['sleep_hours', 'physical_activity', 'learning_disabilities'],
+    'coordinator': ['parental_involvement', 'parental_education_level', 'distance_from_home'],
+    'viewer': ['peer_influence'],
+}
+
+
+def charts_for_role(role):
+    return [CHARTS_BY_ID[chart_id] for chart_id in ROLE_CHARTS.get(role, ROLE_CHARTS['viewer'])]
+
+
+# Layout every chart shares, including Plotly's default template. The
+# dashboard fetches it once; each chart payload then carries only its own
+# title, axis labels and data.
+SHARED_LAYOUT = {
+    'template': pio.templates[pio.templates.default].to_plotly_json(),
+    'legend': {'tracegroupgap': 0},
+    'margin': {'t': 60},
+    'barmode': 'relative',
+}
+INT32 = np.iinfo(np.int32)
+
+
+def shared_layout_json():
+    return json.dumps(SHARED_LAYOUT, cls=plotly.utils.PlotlyJSONEncoder)
+
+
+def encode_array(values):
+    """Numbers as a base64 little-endian typed array, anything else as a list."""
+    array = np.asarray(values)
+    if array.dtype.kind in 'biu' and (not len(array) or INT32.min <= array.min() <= array.max() <= INT32.max):
+        return {'dtype': 'i4', 'data': base64.b64encode(array.astype('<i4').tobytes()).decode()}
+    if array.dtype.kind in 'biuf':
+        return {'dtype': 'f8', 'data': base64.b64encode(array.astype('<f8').tobytes()).decode()}
+    return array.tolist()
+
+
+def compact_chart(chart, data):
+    return json.dumps({'chart_id': chart.chart_id, 'title': chart.title, 'kind': 'bar',
+                       'x_label': chart.group_by, 'y_label': chart.metric,
+                       'x': encode_array(data[chart.group_by]), 'y': encode_array(data[chart.metric])})
+
+
+def staged_rows(chunk):
+    return SCHEMA.to_model(ETL().transformation(chunk))
+
+
+def dashboard_repository():
+    if current_app.config.get('DASHBOARD_SOURCE') == 'staging':
+        return StagingRepository(current_app.config['STAGING_DIR'], SCHEMA.columns, staged_rows)
+    return get_repository()
+
+
+def chart_data(chart):
+    frame = dashboard_repository().aggregate(chart.group_by, [('avg', chart.metric)])
+    return frame.rename(columns={f'avg_{chart.metric}': chart.metric})
+
+
+def render_chart(chart):
+    return compact_chart(chart, chart_data(chart))
+
+
+def chart_payload(chart):
+    data = chart_data(chart)
+    return json.dumps({'chart_id': chart.chart_id, 'title': chart.title,
+                       'x_label': chart.group_by, 'y_label': chart.metric,
+                       'x': data[chart.group_by].tolist(), 'y': data[chart.metric].tolist()})
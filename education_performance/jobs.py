@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+FINISHED = ('done', 'failed')
+
+
+class JobAlreadyRunning(Exception):
+    def __init__(self, job):
+        super().__init__(f"Job {job.job_id} is already running")
+        self.job = job
+
+
+class Job:
+    def __init__(self, name):
+        self.job_id = uuid.uuid4().hex
+        self.name = name
+        self.phase = 'queued'
+        self.rows = 0
+        self.error = None
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def update(self, phase, rows=None):
+        self.phase = phase
+        if rows is not None:
+            self.rows = rows
+
+    @property
+    def finished(self):
+        return self.phase in FINISHED
+
+    def to_dict(self):
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            'job_id': self.job_id,
+            'name': self.name,
+            'phase': self.phase,
+            'rows': self.rows,
+            'elapsed': elapsed,
+            'rows_per_second': self.rows / elapsed if elapsed else None,
+            'error': self.error,
+        }
+
+
+class JobManager:
+    """Runs jobs on a local thread pool inside an app context; no broker needed.
+
+    Only one job per name may be queued or running at a time in this process.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.history = 50
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._active = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.history = app.config.get('JOB_HISTORY', 50)
+        self._executor = ThreadPoolExecutor(max_workers=app.config.get('JOB_WORKERS', 2),
+                                            thread_name_prefix='job')
+        app.extensions['jobs'] = self
+
+    def submit(self, name, fn, *args):
+        with self._lock:
+            active = self._active.get(name)
+            if active is not None and not active.finished:
+                raise JobAlreadyRunning(active)
+            job = Job(name)
+            self._active[name] = job
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, fn, args):
+        with self.app.app_context():
+            job.started_at = time.time()
+            job.update('running')
+            try:
+                fn(job, *args)
+                job.update('done')
+            except Exception as e:
+                logger.error(f"Job {job.job_id} failed: {e}")
+                job.error = str(e)
+                job.update('failed')
+            finally:
+                job.finished_at = time.time()
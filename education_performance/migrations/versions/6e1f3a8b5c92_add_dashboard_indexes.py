@@ -0,0 +1,53 @@
+"""Add covering indexes for dashboard dimensions
+
+Revision ID: 6e1f3a8b5c92
+Revises: 
+Create Date: 2026-10-18 14:09:52.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e1f3a8b5c92'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# education_data is created by db.create_all(), which also creates these
+# indexes on a fresh database; only existing tables need them added.
+INDEXES = {
+    'ix_education_data_hours_studied': ['hours_studied', 'exam_score', 'sleep_hours'],
+    'ix_education_data_attendance': ['attendance', 'exam_score', 'sleep_hours'],
+    'ix_education_data_sleep_hours': ['sleep_hours', 'exam_score'],
+    'ix_education_data_physical_activity': ['physical_activity', 'exam_score', 'sleep_hours'],
+    'ix_education_data_learning_disabilities': ['learning_disabilities', 'exam_score', 'sleep_hours'],
+    'ix_education_data_parental_involvement': ['parental_involvement', 'exam_score', 'sleep_hours'],
+    'ix_education_data_parental_education_level': ['parental_education_level', 'exam_score', 'sleep_hours'],
+    'ix_education_data_distance_from_home': ['distance_from_home', 'exam_score', 'sleep_hours'],
+    'ix_education_data_peer_influence': ['peer_influence', 'exam_score', 'sleep_hours'],
+}
+
+
+def _existing_indexes():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('education_data'):
+        return None
+    return {index['name'] for index in inspector.get_indexes('education_data')}
+
+
+def upgrade():
+    existing = _existing_indexes()
+    if existing is None:
+        return
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'education_data', columns, unique=False)
+
+
+def downgrade():
+    existing = _existing_indexes() or set()
+    for name in reversed(list(INDEXES)):
+        if name in existing:
+            op.drop_index(name, table_name='education_data')
@@ -0,0 +1,42 @@
+"""Widen user.password_hash for scrypt hashes
+
+Revision ID: 7b2d9e4f1c08
+Revises: 6e1f3a8b5c92
+Create Date: 2026-10-18 16:42:10.538214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2d9e4f1c08'
+down_revision = '6e1f3a8b5c92'
+branch_labels = None
+depends_on = None
+
+
+# The user table comes from db.create_all(); a scrypt hash with werkzeug's
+# default parameters is 162 characters, past the old limit of 128.
+def _has_user_table():
+    return sa.inspect(op.get_bind()).has_table('user')
+
+
+def upgrade():
+    if not _has_user_table():
+        return
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+                              existing_type=sa.String(length=128),
+                              type_=sa.String(length=256),
+                              existing_nullable=True)
+
+
+def downgrade():
+    if not _has_user_table():
+        return
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+                              existing_type=sa.String(length=256),
+                              type_=sa.String(length=128),
+                              existing_nullable=True)
@@ -0,0 +1,42 @@
+"""Create ingested files manifest table
+
+Revision ID: c4e7a2d91b35
+Revises: 7b2d9e4f1c08
+Create Date: 2026-10-18 18:05:13.402671
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e7a2d91b35'
+down_revision = '7b2d9e4f1c08'
+branch_labels = None
+depends_on = None
+
+
+# db.create_all() may already have created the table on a fresh database.
+def _has_table():
+    return sa.inspect(op.get_bind()).has_table('ingested_files')
+
+
+def upgrade():
+    if _has_table():
+        return
+    op.create_table('ingested_files',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String(length=255), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('mtime_ns', sa.BigInteger(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('rows', sa.Integer(), nullable=True),
+    sa.Column('ingested_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('path')
+    )
+
+
+def downgrade():
+    if _has_table():
+        op.drop_table('ingested_files')
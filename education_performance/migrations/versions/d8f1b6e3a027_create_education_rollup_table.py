@@ -0,0 +1,42 @@
+"""Create education_rollup table for dashboard aggregates
+
+Revision ID: d8f1b6e3a027
+Revises: c4e7a2d91b35
+Create Date: 2026-10-18 18:07:48.915320
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8f1b6e3a027'
+down_revision = 'c4e7a2d91b35'
+branch_labels = None
+depends_on = None
+
+
+# db.create_all() may already have created the table on a fresh database.
+# An empty rollup table is rebuilt from education_data by the next ETL run.
+def _has_table():
+    return sa.inspect(op.get_bind()).has_table('education_rollup')
+
+
+def upgrade():
+    if _has_table():
+        return
+    op.create_table('education_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('dimension', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('sum_exam_score', sa.Float(), nullable=False),
+    sa.Column('sum_sleep_hours', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('dimension', 'value', name='uq_education_rollup_dimension_value')
+    )
+
+
+def downgrade():
+    if _has_table():
+        op.drop_table('education_rollup')
@@ -1,25 +1,52 @@
 
+from datetime import datetime
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
 
-from extensions import db
+from extensions import db, backends, user_cache, password_hasher
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128))
+    password_hash = db.Column(db.String(256))
     role = db.Column(db.String(20), nullable=False, default='viewer')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.check(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
+
+
+# Registration, role changes and deletes drop the cached identity, so the
+# next request reloads it.
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate((backends.current(object_session(target)), target.id))
 
 
 
 class EducationData(db.Model):
     __tablename__ = 'education_data'
+    # One covering index per dashboard dimension: rebuilding a rollup is a
+    # GROUP BY over the dimension summing exam_score and sleep_hours.
+    __table_args__ = (
+        db.Index('ix_education_data_hours_studied', 'hours_studied', 'exam_score', 'sleep_hours'),
+        db.Index('ix_education_data_attendance', 'attendance', 'exam_score', 'sleep_hours'),
+        db.Index('ix_education_data_sleep_hours', 'sleep_hours', 'exam_score'),
+        db.Index('ix_education_data_physical_activity', 'physical_activity', 'exam_score', 'sleep_hours'),
+        db.Index('ix_education_data_learning_disabilities', 'learning_disabilities', 'exam_score', 'sleep_hours'),
+        db.Index('ix_education_data_parental_involvement', 'parental_involvement', 'exam_score', 'sleep_hours'),
+        db.Index('ix_education_data_parental_education_level', 'parental_education_level', 'exam_score', 'sleep_hours'),
+        db.Index('ix_education_data_distance_from_home', 'distance_from_home', 'exam_score', 'sleep_hours'),
+        db.Index('ix_education_data_peer_influence', 'peer_influence', 'exam_score', 'sleep_hours'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     hours_studied = db.Column(db.Float)
     attendance = db.Column(db.Float)
@@ -32,3 +59,24 @@ class EducationData(db.Model):
     peer_influence = db.Column(db.String(20))
     exam_score = db.Column(db.Float)
 
+
+class EducationRollup(db.Model):
+    __tablename__ = 'education_rollup'
+    __table_args__ = (db.UniqueConstraint('dimension', 'value', name='uq_education_rollup_dimension_value'),)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    dimension = db.Column(db.String(50), nullable=False)
+    value = db.Column(db.String(50), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    sum_exam_score = db.Column(db.Float, nullable=False, default=0)
+    sum_sleep_hours = db.Column(db.Float, nullable=False, default=0)
+
+
+class IngestedFile(db.Model):
+    __tablename__ = 'ingested_files'
+    id = db.Column(db.Integer, primary_key=True)
+    path = db.Column(db.String(255), unique=True, nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    mtime_ns = db.Column(db.BigInteger, nullable=False)
+    content_hash = db.Column(db.String(64), nullable=False)
+    rows = db.Column(db.Integer)
+    ingested_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,325 @@
+import logging
+import pandas as pd
+from flask import current_app
+from pymongo import ASCENDING, ReturnDocument
+from extensions import mongo
+from models import EducationData, EducationRollup
+from bulk_loader import bulk_insert, coerce_to_table, DEFAULT_BATCH_SIZE
+from queries import run_group_by, iter_frames
+from rollups import (ROLLUP_DIMENSIONS, ROLLUP_METRICS, update_rollups, rebuild_rollups,
+                     rollups_missing, rollup_frame, rollup_means)
+from staging import iter_staged, staged_files
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = [column.name for column in EducationData.__table__.columns]
+COLLECTION = 'education_data'
+# aggregate() statistics under their pandas names.
+PANDAS_STATS = {'avg': 'mean', 'sum': 'sum', 'count': 'count', 'min': 'min', 'max': 'max'}
+
+
+def records(frame):
+    """Frame rows as dicts of plain Python values, missing values as None."""
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+
+def metric_name(aggregate, column):
+    return f'{aggregate}_{column}'
+
+
+class Repository:
+    """Everything the dashboards, the API and the ETL need from a store.
+
+    Frames use EducationData's column names and ``filters`` is a RuleSet
+    or None. Each store answers with its own fastest mechanism, so one can
+    be swapped or benchmarked against another without touching callers.
+    """
+
+    # Whether writes join db.session's transaction, and so roll back with
+    # it. Writes to other stores are undone with discard_since().
+    transactional = True
+
+    def checkpoint(self):
+        """A marker for discard_since(); None for transactional stores."""
+        return None
+
+    def discard_since(self, checkpoint):
+        """Remove rows written after ``checkpoint`` was taken."""
+
+    def prepare_run(self):
+        """Called once per ETL run, before it loads anything; the ETL commits."""
+
+    def clear(self):
+        raise NotImplementedError
+
+    def bulk_load(self, frame):
+        """Append ``frame``'s rows; returns how many were written."""
+        raise NotImplementedError
+
+    def aggregate(self, group_by, metrics, filters=None, by_value=False):
+        """One row per non-null ``group_by`` value, ordered by it.
+
+        ``metrics`` is a list of (aggregate, column) pairs, each becoming a
+        ``<aggregate>_<column>`` column. With ``by_value`` rows are ordered
+        by the first metric, largest first.
+        """
+        raise NotImplementedError
+
+    def stream_rows(self, batch_size, filters=None, after_id=0, limit=None):
+        """Yield rows with ``id > after_id`` in id order, as frames of ``batch_size``.
+
+        Stops after ``limit`` rows if given. Always yields at least one
+        frame, so callers can rely on the column names.
+        """
+        raise NotImplementedError
+
+
+class SqlRepository(Repository):
+    """education_data in the active SQL backend, with per-dimension rollups."""
+
+    def clear(self):
+        EducationData.query.delete()
+        EducationRollup.query.delete()
+
+    def prepare_run(self):
+        if rollups_missing():
+            # Folding only new frames in would leave out the older rows.
+            rebuild_rollups()
+
+    def bulk_load(self, frame):
+        rows = bulk_insert(frame, EducationData.__table__,
+                           batch_size=current_app.config.get('BULK_LOAD_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+        update_rollups(frame)
+        return rows
+
+    def aggregate(self, group_by, metrics, filters=None, by_value=False):
+        rollups = None
+        if (filters is None and group_by in ROLLUP_DIMENSIONS
+                and all(name == 'avg' and column in ROLLUP_METRICS for name, column in metrics)):
+            # The rollup table answers unfiltered means without a scan. Until
+            # rollups are built it is empty, and GROUP BY answers instead.
+            rollups = rollup_frame(group_by)
+        if rollups is not None and len(rollups):
+            frame = None
+            for name, column in metrics:
+                means = rollup_means(rollups, group_by, column)
+                if frame is None:
+                    frame = means[[group_by]].copy()
+                frame[metric_name(name, column)] = means[column].values
+            if by_value:
+                frame = frame.sort_values(frame.columns[1], ascending=False).reset_index(drop=True)
+            return frame
+        where = filters.criteria(EducationData) if filters is not None else ()
+        return run_group_by(EducationData, group_by, metrics, by_value=by_value, where=where)
+
+    def stream_rows(self, batch_size, filters=None, after_id=0, limit=None):
+        where = filters.criteria(EducationData) if filters is not None else ()
+        return iter_frames(EducationData, batch_size, where=where, after_id=after_id, limit=limit)
+
+
+class MongoRepository(Repository):
+    """education_data as one MongoDB document per student.
+
+    Loads are unordered insert_many batches and aggregations are $group
+    pipelines, so grouping runs inside mongod and only one small document
+    per group comes back. Documents get integer ``_id`` values from a
+    counter document, so they page and export like SQL rows. Takes a
+    pymongo collection, or anything with the same API, such as a mongomock
+    one in tests.
+    """
+
+    transactional = False
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.counters = collection.database[f'{collection.name}_counters']
+
+    def ensure_indexes(self):
+        # Like the SQL indexes: each leads with a dashboard dimension and
+        # carries the measures its charts average, so the sorted scan in
+        # aggregate() can be answered from the index alone.
+        for dimension in ROLLUP_DIMENSIONS:
+            keys = [(dimension, ASCENDING)] + [
+                (measure, ASCENDING) for measure in ('exam_score', 'sleep_hours') if measure != dimension]
+            self.collection.create_index(keys, name=f'ix_{dimension}')
+
+    def clear(self):
+        # The id counter keeps counting, so ids are never reused.
+        self.collection.delete_many({})
+
+    def checkpoint(self):
+        counter = self.counters.find_one({'_id': self.collection.name})
+        return counter['seq'] if counter else 0
+
+    def discard_since(self, checkpoint):
+        # Ids only grow, so everything written since has a larger one.
+        self.collection.delete_many({'_id': {'$gt': checkpoint}})
+
+    def _reserve_ids(self, count):
+        counter = self.counters.find_one_and_update(
+            {'_id': self.collection.name}, {'$inc': {'seq': count}},
+            upsert=True, return_document=ReturnDocument.AFTER)
+        return counter['seq'] - count + 1
+
+    def bulk_load(self, frame):
+        batch_size = current_app.config.get('BULK_LOAD_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        # Typed like the SQL columns, so both stores chart and export alike.
+        frame = coerce_to_table(frame.drop(columns=['id'], errors='ignore'), EducationData.__table__)
+        documents = records(frame)
+        if not documents:
+            return 0
+        first_id = self._reserve_ids(len(documents))
+        for offset, document in enumerate(documents):
+            document['_id'] = first_id + offset
+        for start in range(0, len(documents), batch_size):
+            self.collection.insert_many(documents[start:start + batch_size], ordered=False)
+        logger.debug(f"Inserted {len(documents)} documents")
+        return len(documents)
+
+    def _match(self, filters, *conditions):
+        conditions = list(conditions)
+        if filters is not None and filters.rules:
+            conditions.append(filters.mongo_query(COLUMNS))
+        return {'$and': conditions} if conditions else {}
+
+    def aggregate(self, group_by, metrics, filters=None, by_value=False):
+        group = {'_id': f'${group_by}'}
+        for name, column in metrics:
+            field = '$_id' if column == 'id' else f'${column}'
+            if name == 'count':
+                # COUNT(column) skips nulls.
+                group[metric_name(name, column)] = {'$sum': {'$cond': [{'$ne': [field, None]}, 1, 0]}}
+            else:
+                group[metric_name(name, column)] = {f'${name}': field}
+        order = {metric_name(*metrics[0]): -1} if by_value else {'_id': 1}
+        pipeline = [
+            {'$match': self._match(filters, {group_by: {'$ne': None}})},
+            # Sorting on the group field first lets the planner walk its index.
+            {'$sort': {group_by: 1}},
+            {'$group': group},
+            {'$sort': order},
+        ]
+        rows = list(self.collection.aggregate(pipeline))
+        columns = [group_by] + [metric_name(name, column) for name, column in metrics]
+        return pd.DataFrame([[row['_id']] + [row[name] for name in columns[1:]] for row in rows],
+                            columns=columns)
+
+    def stream_rows(self, batch_size, filters=None, after_id=0, limit=None):
+        cursor = self.collection.find(self._match(filters, {'_id': {'$gt': after_id}}))
+        cursor = cursor.sort('_id', ASCENDING).batch_size(batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+        batch = []
+        empty = True
+        for document in cursor:
+            document['id'] = document.pop('_id')
+            batch.append(document)
+            if len(batch) == batch_size:
+                empty = False
+                yield self._frame(batch)
+                batch = []
+        if batch or empty:
+            yield self._frame(batch)
+
+    def _frame(self, documents):
+        # Documents loaded before bulk_load coerced types may hold numbers
+        # in string columns.
+        return coerce_to_table(pd.DataFrame(documents, columns=COLUMNS), EducationData.__table__)
+
+
+class StagingRepository(Repository):
+    """The Parquet staging area, read only, for DASHBOARD_SOURCE = 'staging'.
+
+    Serves the sources extraction staged, which ``transform`` turns into
+    model columns as the ETL would. Only extraction writes here, so clear()
+    and bulk_load() raise. Rows have no surrogate key, so ids are row
+    ordinals across the staged files in name order, stable until a source
+    is restaged.
+    """
+
+    def __init__(self, staging_dir, columns, transform, chunksize=DEFAULT_BATCH_SIZE):
+        self.staging_dir = staging_dir
+        self.columns = columns
+        self.transform = transform
+        self.chunksize = chunksize
+
+    def _chunks(self):
+        for path in staged_files(self.staging_dir):
+            yield from iter_staged(path, self.chunksize, self.columns)
+
+    def _frames(self, filters=None):
+        next_id = 1
+        for chunk in self._chunks():
+            # Numbered before transform drops rows, so ids stay stable.
+            chunk.index = pd.RangeIndex(next_id, next_id + len(chunk))
+            next_id += len(chunk)
+            frame = self.transform(chunk)
+            frame.insert(0, 'id', frame.index)
+            frame = frame[[name for name in COLUMNS if name in frame.columns]].reset_index(drop=True)
+            # Typed like the SQL columns, as MongoRepository's frames are.
+            frame = coerce_to_table(frame, EducationData.__table__)
+            if filters is not None:
+                frame, _ = filters.filter(frame)
+            yield frame
+
+    def clear(self):
+        raise TypeError("The staging area is read only; restage it by running the ETL")
+
+    def bulk_load(self, frame):
+        raise TypeError("The staging area is read only; the ETL loads the SQL store")
+
+    def _all_rows(self, filters):
+        frames = list(self._frames(filters))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COLUMNS)
+
+    def aggregate(self, group_by, metrics, filters=None, by_value=False):
+        frame = self._all_rows(filters)
+        named = {metric_name(name, column): (column, PANDAS_STATS[name]) for name, column in metrics}
+        result = frame.groupby(group_by, observed=True).agg(**named).reset_index()
+        if by_value:
+            return result.sort_values(result.columns[1], ascending=False).reset_index(drop=True)
+        return result.sort_values(group_by).reset_index(drop=True)
+
+    def stream_rows(self, batch_size, filters=None, after_id=0, limit=None):
+        # Staging has no index on id, so earlier rows are read and skipped.
+        # Only one staged chunk and one batch are held at a time.
+        batch, buffered, sent = [], 0, 0
+        for frame in self._frames(filters):
+            frame = frame[frame['id'] > after_id]
+            if limit:
+                frame = frame.iloc[:limit - sent - buffered]
+            while len(frame):
+                part, frame = frame.iloc[:batch_size - buffered], frame.iloc[batch_size - buffered:]
+                batch.append(part)
+                buffered += len(part)
+                if buffered == batch_size:
+                    yield pd.concat(batch, ignore_index=True)
+                    batch, buffered, sent = [], 0, sent + buffered
+            if limit and sent + buffered >= limit:
+                break
+        if batch or not sent:
+            yield pd.concat(batch, ignore_index=True) if batch else pd.DataFrame(columns=COLUMNS)
+
+
+def mongo_repository():
+    repository = MongoRepository(mongo.db[COLLECTION])
+    repository.ensure_indexes()
+    return repository
+
+
+STORES = {
+    'sql': SqlRepository,
+    'mongo': mongo_repository,
+}
+
+
+def get_repository():
+    """The repository for the app's DATA_STORE, built on first use.
+
+    Tests can put their own in ``app.extensions['repository']``.
+    """
+    repository = current_app.extensions.get('repository')
+    if repository is None:
+        repository = STORES[current_app.config.get('DATA_STORE', 'sql')]()
+        current_app.extensions['repository'] = repository
+    return repository
@@ -0,0 +1,52 @@
+import gzip
+import hashlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Below this size compression costs more than the bytes it saves.
+MIN_COMPRESS_SIZE = 256
+
+
+def negotiate_encoding(size):
+    if size < MIN_COMPRESS_SIZE:
+        return None
+    if brotli is not None and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def json_response(payload, max_age=None):
+    """Serve a JSON string compressed, with an ETag and 304 revalidation.
+
+    Without ``max_age`` clients must revalidate every time, which costs a
+    304 and no body until an ETL load changes the payload.
+    """
+    body = payload.encode()
+    encoding = negotiate_encoding(len(body))
+    # Each encoding is a different representation, so it gets its own tag.
+    etag = hashlib.sha1(body).hexdigest()[:20] + (f'-{encoding}' if encoding else '')
+    response = current_app.response_class(mimetype='application/json')
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.private = True
+    if max_age is None:
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.max_age = max_age
+    if request.if_none_match.contains(etag):
+        response.status_code = 304
+        return response
+    if encoding == 'br':
+        body = brotli.compress(body)
+    elif encoding == 'gzip':
+        body = gzip.compress(body, compresslevel=6)
+    if encoding:
+        response.content_encoding = encoding
+    response.set_data(body)
+    return response
@@ -0,0 +1,120 @@
+import numbers
+import pandas as pd
+from extensions import db
+from models import EducationData, EducationRollup
+from queries import group_by_statement
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Every dashboard chart groups by one of these columns; numeric ones are
+# sorted numerically on the way out instead of lexically.
+ROLLUP_DIMENSIONS = [
+    'hours_studied',
+    'attendance',
+    'sleep_hours',
+    'physical_activity',
+    'learning_disabilities',
+    'parental_involvement',
+    'parental_education_level',
+    'distance_from_home',
+    'peer_influence',
+]
+NUMERIC_DIMENSIONS = {'hours_studied', 'attendance', 'sleep_hours'}
+ROLLUP_METRICS = {
+    'exam_score': 'sum_exam_score',
+    'sleep_hours': 'sum_sleep_hours',
+}
+
+
+def rollup_key(value):
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        # repr() round-trips every float, so values that differ only past
+        # the sixth significant digit keep separate rows. Whole numbers
+        # drop the '.0', as the keys stored before were written.
+        key = repr(float(value))
+        return key[:-2] if key.endswith('.0') else key
+    return str(value)
+
+
+def _merge(dimension, groups):
+    existing = {r.value: r for r in EducationRollup.query.filter_by(dimension=dimension)}
+    for value, count, sum_exam_score, sum_sleep_hours in groups:
+        key = rollup_key(value)
+        row = existing.get(key)
+        if row is None:
+            row = EducationRollup(dimension=dimension, value=key, count=0,
+                                  sum_exam_score=0, sum_sleep_hours=0)
+            db.session.add(row)
+            existing[key] = row
+        row.count += int(count)
+        row.sum_exam_score += float(sum_exam_score or 0)
+        row.sum_sleep_hours += float(sum_sleep_hours or 0)
+
+
+def update_rollups(df):
+    """Fold a freshly loaded frame (model column names) into the rollup table.
+
+    The caller owns the transaction, so the rollups commit together with the
+    rows they describe.
+    """
+    for dimension in ROLLUP_DIMENSIONS:
+        grouped = df.groupby(dimension, observed=True).agg(
+            count=('exam_score', 'size'),
+            sum_exam_score=('exam_score', 'sum'),
+            sum_sleep_hours=('sleep_hours', 'sum'))
+        _merge(dimension, grouped.itertuples(name=None))
+    logger.debug("rollups updated")
+
+
+def rebuild_rollups():
+    """Recompute every rollup from education_data with one GROUP BY per dimension."""
+    EducationRollup.query.delete()
+    for dimension in ROLLUP_DIMENSIONS:
+        stmt = group_by_statement(EducationData, dimension, [
+            ('count', 'id'),
+            ('sum', 'exam_score'),
+            ('sum', 'sleep_hours')
+        ])
+        _merge(dimension, db.session.execute(stmt).all())
+    logger.debug("rollups rebuilt")
+
+
+def rollups_missing():
+    """True when education_data has rows but the rollup table is empty.
+
+    That happens for rows loaded before the rollup table existed; each ETL
+    run checks once, before loading, and ``flask rebuild-rollups`` rebuilds
+    on demand.
+    """
+    return (db.session.query(EducationRollup.id).first() is None
+            and db.session.query(EducationData.id).first() is not None)
+
+
+def rollup_frame(dimension=None):
+    """Rollup rows as a frame; empty if none were built.
+
+    Read-only, so chart requests never write. Rollups are built by the ETL
+    and ``flask rebuild-rollups``.
+    """
+    query = EducationRollup.query
+    if dimension is not None:
+        query = query.filter_by(dimension=dimension)
+    rows = query.all()
+    return pd.DataFrame([{
+        'dimension': r.dimension,
+        'value': r.value,
+        'count': r.count,
+        'sum_exam_score': r.sum_exam_score,
+        'sum_sleep_hours': r.sum_sleep_hours
+    } for r in rows], columns=['dimension', 'value', 'count', 'sum_exam_score', 'sum_sleep_hours'])
+
+
+def rollup_means(frame, dimension, metric):
+    part = frame[frame['dimension'] == dimension]
+    values = part['value'].astype(float) if dimension in NUMERIC_DIMENSIONS else part['value']
+    means = pd.DataFrame({
+        dimension: values.values,
+        metric: (part[ROLLUP_METRICS[metric]] / part['count']).values
+    })
+    return means.sort_values(dimension).reset_index(drop=True)
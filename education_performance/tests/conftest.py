@@ -0,0 +1,132 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db, backends, chart_cache, user_cache  # noqa: E402
+
+STUDENTS = [
+    # Hours_Studied, Attendance, Sleep_Hours, Physical_Activity, Learning_Disabilities,
+    # Parental_Involvement, Parental_Education_Level, Distance_from_Home, Peer_Influence, Exam_Score
+    (23, 84, 7, 4, 'No', 'Low', 'High School', 'Near', 'Positive', 67),
+    (19, 64, 8, 4, 'No', 'Low', 'College', 'Moderate', 'Negative', 61),
+    (24, 98, 7, 4, 'No', 'Medium', 'Postgraduate', 'Near', 'Neutral', 74),
+    (29, 89, 8, 4, 'No', 'Low', 'High School', 'Moderate', 'Negative', 71),
+    (19, 92, 6, 4, 'No', 'Medium', 'College', 'Near', 'Neutral', 70),
+    (19, 88, 8, 3, 'No', 'High', 'Postgraduate', 'Near', 'Positive', 71),
+    (29, 84, 7, 2, 'No', 'Medium', 'High School', 'Moderate', 'Neutral', 67),
+    (25, 78, 6, 2, 'Yes', 'Low', 'High School', 'Far', 'Negative', 66),
+    (17, 94, 6, 1, 'No', 'Medium', 'College', 'Near', 'Neutral', 69),
+    (23, 98, 8, 5, 'No', 'Medium', 'High School', 'Moderate', 'Positive', 72),
+    (0, 80, 7, 3, 'No', 'High', 'College', 'Near', 'Positive', 65),
+    (21, 83, 0, 3, 'Yes', 'Low', 'High School', 'Far', 'Negative', 60),
+]
+SOURCE_COLUMNS = [
+    'Hours_Studied', 'Attendance', 'Sleep_Hours', 'Physical_Activity', 'Learning_Disabilities',
+    'Parental_Involvement', 'Parental_Education_Level', 'Distance_from_Home', 'Peer_Influence',
+    'Exam_Score',
+]
+# Students that pass the ETL's rules: no zero hours studied or sleep hours.
+VALID_STUDENTS = 10
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config.from_object('config.Config')
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'education.db'}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        DATABASE_BACKEND='sqlite',
+        DATABASE_BACKENDS={},
+        BULK_LOAD_BATCH_SIZE=3,
+        STAGING_DIR=str(tmp_path / 'staging'),
+    )
+    db.init_app(app)
+    backends.init_app(app, db)
+    chart_cache.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    """Two CSV sources under data_sources/, six students each."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('data_sources')
+    frame = pd.DataFrame(STUDENTS, columns=SOURCE_COLUMNS)
+    paths = []
+    for number, part in enumerate((frame.iloc[:6], frame.iloc[6:]), start=1):
+        path = os.path.join('data_sources', f'part{number}.csv')
+        part.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def mongo_repository(app):
+    mongomock = pytest.importorskip('mongomock')
+    from repository import MongoRepository
+    repository = MongoRepository(mongomock.MongoClient().db.education_data)
+    repository.ensure_indexes()
+    app.extensions['repository'] = repository
+    return repository
+
+
+@pytest.fixture(scope='session')
+def web_app(tmp_path_factory):
+    """The app module, imported once with SQLiteConfig pointed at a temp dir."""
+    import config
+    tmp_path = tmp_path_factory.mktemp('web')
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('APP_CONFIG', 'config.SQLiteConfig')
+        for name, value in {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'education.db'}",
+            'DATABASE_BACKENDS': {},
+            'STAGING_DIR': str(tmp_path / 'staging'),
+            'WTF_CSRF_ENABLED': False,
+        }.items():
+            patch.setattr(config.SQLiteConfig, name, value, raising=False)
+        # The app opens its log files in the working directory.
+        patch.chdir(tmp_path)
+        import app as web_app
+    return web_app
+
+
+@pytest.fixture
+def client(web_app):
+    """A test client for the real app, on empty tables."""
+    app = web_app.app
+    # Each ``app`` fixture registers its own engine; take the registry back.
+    backends.init_app(app, db)
+    user_cache.clear()
+    chart_cache.clear()
+    with app.app_context():
+        db.create_all()
+    yield app.test_client()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def login(client):
+    """Log the client in as a new user with the given role."""
+    from models import User
+
+    def login(role):
+        with client.application.app_context():
+            user = User(username=role, email=f'{role}@example.com', role=role)
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+    return login
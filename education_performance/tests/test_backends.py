@@ -0,0 +1,68 @@
+import pytest
+from flask import Flask
+from backends import BackendRegistry, BackendUnavailable
+from extensions import db, backends
+from models import User
+
+
+@pytest.fixture
+def registry(tmp_path):
+    main, other = f"sqlite:///{tmp_path / 'main.db'}", f"sqlite:///{tmp_path / 'other.db'}"
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=main,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        DATABASE_BACKEND='main',
+        DATABASE_BACKENDS={'main': main, 'other': other, 'broken': 'nodriver://localhost/db'},
+    )
+    db.init_app(app)
+    registry = BackendRegistry(app, db)
+    with app.app_context():
+        for name in ('main', 'other'):
+            db.metadata.create_all(registry.engine(name))
+        yield registry
+        db.session.remove()
+
+
+def users(registry, name):
+    with registry.engine(name).connect() as connection:
+        return connection.execute(User.__table__.select()).all()
+
+
+def test_unavailable_backends_are_reported(registry):
+    assert registry.names == ['main', 'other']
+    assert 'broken' in registry.unavailable
+    with pytest.raises(BackendUnavailable):
+        registry.switch('broken')
+    with pytest.raises(BackendUnavailable):
+        registry.switch('missing')
+    assert registry.active == 'main'
+
+
+def test_next_backend_cycles(registry):
+    assert registry.next_backend() == 'other'
+    registry.switch('other')
+    assert registry.next_backend() == 'main'
+
+
+def test_session_keeps_its_backend(registry):
+    assert User.query.count() == 0
+    registry.switch('other')
+    # The open session bound to main on first use and stays there.
+    db.session.add(User(username='during', email='during@example.com'))
+    db.session.commit()
+    db.session.remove()
+    db.session.add(User(username='after', email='after@example.com'))
+    db.session.commit()
+    assert [user.username for user in users(registry, 'main')] == ['during']
+    assert [user.username for user in users(registry, 'other')] == ['after']
+
+
+def test_switch_needs_admin(client, login):
+    login('viewer')
+    response = client.get('/switch_database?backend=sqlite', follow_redirects=True)
+    assert b'Permission denied' in response.data
+    login('admin')
+    response = client.get('/switch_database?backend=missing', follow_redirects=True)
+    assert b'Unknown database backend' in response.data
+    assert backends.active == 'sqlite'
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from bulk_loader import bulk_insert, coerce_to_table
+from extensions import db
+from models import EducationData
+
+TABLE = EducationData.__table__
+FRAME = pd.DataFrame({
+    'hours_studied': [23, 19, 24, 29, 19],
+    'sleep_hours': [7.0, 8.0, np.nan, 8.0, 6.0],
+    'physical_activity': [3, 4, 4, 4, 3],
+    'peer_influence': ['Positive', 'Negative', None, 'Neutral', 'Positive'],
+    'exam_score': [67.0, 61.0, 74.0, np.nan, 66.0],
+})
+
+
+def test_coerce_to_table():
+    coerced = coerce_to_table(FRAME, TABLE)
+    assert str(coerced['hours_studied'].dtype) == 'Float64'
+    assert str(coerced['physical_activity'].dtype) == 'string'
+    assert coerced['physical_activity'].tolist() == ['3', '4', '4', '4', '3']
+    assert FRAME['physical_activity'].dtype == np.int64
+
+
+def test_bulk_insert_in_batches(app):
+    assert bulk_insert(FRAME, TABLE, batch_size=2) == len(FRAME)
+    stored = db.session.query(EducationData.hours_studied, EducationData.sleep_hours,
+                              EducationData.physical_activity, EducationData.peer_influence,
+                              EducationData.exam_score).order_by(EducationData.id).all()
+    assert [tuple(row) for row in stored] == [
+        (23.0, 7.0, '3', 'Positive', 67.0),
+        (19.0, 8.0, '4', 'Negative', 61.0),
+        (24.0, None, '4', None, 74.0),
+        (29.0, 8.0, '4', 'Neutral', None),
+        (19.0, 6.0, '3', 'Positive', 66.0),
+    ]
+
+
+def test_bulk_insert_leaves_commit_to_caller(app):
+    bulk_insert(FRAME, TABLE)
+    db.session.rollback()
+    assert db.session.query(EducationData).count() == 0
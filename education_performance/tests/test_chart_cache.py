@@ -0,0 +1,63 @@
+import os
+import pytest
+from chart_cache import ChartCache
+
+
+class Builds:
+    """A build function that counts how often it runs."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, name):
+        self.count += 1
+        return f'{name}-{self.count}'
+
+
+@pytest.fixture(params=[False, True], ids=['memory', 'disk'])
+def cache(request, tmp_path):
+    cache = ChartCache()
+    cache.max_entries = 2
+    if request.param:
+        cache.cache_dir = str(tmp_path)
+    return cache
+
+
+def entry_files(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name.endswith('.json'))
+
+
+def test_get_or_set_builds_once(cache):
+    build = Builds()
+    assert cache.get_or_set('a', build, 'a') == 'a-1'
+    assert cache.get_or_set('a', build, 'a') == 'a-1'
+    assert build.count == 1
+
+
+def test_version_bump_invalidates(cache):
+    build = Builds()
+    cache.get_or_set('a', build, 'a')
+    assert cache.bump_version() == 1
+    assert cache.get('a') is None
+    assert cache.get_or_set('a', build, 'a') == 'a-2'
+
+
+def test_disk_entries_survive_a_new_process(tmp_path):
+    first, second = ChartCache(), ChartCache()
+    first.cache_dir = second.cache_dir = str(tmp_path)
+    first.set('a', 'payload')
+    assert second.get('a') == 'payload'
+    first.bump_version()
+    assert second.get('a') is None
+
+
+def test_disk_entries_evicted_with_memory(tmp_path):
+    cache = ChartCache()
+    cache.max_entries = 2
+    cache.cache_dir = str(tmp_path)
+    for key in 'abc':
+        cache.set(key, key)
+    assert entry_files(cache) == ['0-b.json', '0-c.json']
+    cache.get('b')
+    cache.set('d', 'd')
+    assert entry_files(cache) == ['0-b.json', '0-d.json']
@@ -0,0 +1,52 @@
+import base64
+import numpy as np
+import pytest
+from charts import CHARTS, charts_for_role, chart_data
+from etl import ETL
+
+
+@pytest.fixture
+def loaded(client, login, sources):
+    with client.application.app_context():
+        ETL(max_workers=1).run()
+    return client
+
+
+def decode(values):
+    if isinstance(values, dict):
+        return np.frombuffer(base64.b64decode(values['data']), dtype='<' + values['dtype']).tolist()
+    return values
+
+
+def test_dashboard_is_a_shell(loaded, login):
+    login('viewer')
+    page = loaded.get('/dashboard').get_data(as_text=True)
+    charts = charts_for_role('viewer')
+    assert page.count('class="lazy-chart"') == len(charts)
+    for chart in charts:
+        assert f'/dashboard/charts/{chart.chart_id}' in page
+
+
+@pytest.mark.parametrize('chart', CHARTS, ids=lambda chart: chart.chart_id)
+def test_chart_matches_its_data(loaded, login, chart):
+    login('admin')
+    payload = loaded.get(f'/dashboard/charts/{chart.chart_id}').get_json()
+    with loaded.application.app_context():
+        expected = chart_data(chart)
+    assert payload['chart_id'] == chart.chart_id
+    assert decode(payload['x']) == expected.iloc[:, 0].tolist()
+    assert decode(payload['y']) == pytest.approx(expected.iloc[:, 1].tolist())
+
+
+def test_charts_limited_by_role(loaded, login):
+    login('viewer')
+    hidden = next(chart for chart in CHARTS if chart not in charts_for_role('viewer'))
+    assert loaded.get(f'/dashboard/charts/{hidden.chart_id}').status_code == 403
+    assert loaded.get('/dashboard/charts/unknown').status_code == 404
+
+
+def test_layout_cached_by_browsers(loaded, login):
+    login('viewer')
+    response = loaded.get('/dashboard/layout')
+    assert response.cache_control.max_age == 86400
+    assert 'template' in response.get_json()
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+from etl import ETL, compact_dtypes
+from models import EducationData, IngestedFile
+from repository import SqlRepository
+from conftest import VALID_STUDENTS
+
+
+def test_parallel_extract_matches_serial(app, sources):
+    serial = ETL(max_workers=1).extract_data()
+    parallel = ETL(max_workers=2).extract_data()
+    assert parallel.reset_index(drop=True).equals(serial.reset_index(drop=True))
+
+
+def loaded_rows():
+    frame = pd.concat(SqlRepository().stream_rows(100), ignore_index=True)
+    return frame.drop(columns='id').sort_values(list(frame.columns[1:])).values.tolist()
+
+
+@pytest.mark.parametrize('chunksize', [1, 4, 100])
+def test_streaming_matches_batch(app, sources, chunksize):
+    assert ETL(max_workers=1).run() == VALID_STUDENTS
+    batch = loaded_rows()
+    assert ETL(max_workers=1, force=True).run(streaming=True, chunksize=chunksize) == VALID_STUDENTS
+    assert loaded_rows() == batch
+
+
+def test_streaming_bounds_chunks(app, sources, monkeypatch):
+    sizes, progress = [], []
+    transformation = ETL.transformation
+
+    def recording(self, df):
+        sizes.append(len(df))
+        return transformation(self, df)
+
+    monkeypatch.setattr(ETL, 'transformation', recording)
+    ETL(max_workers=1, progress=lambda phase, rows=None: progress.append((phase, rows))).run(
+        streaming=True, chunksize=4)
+    assert sizes == [4, 2, 4, 2]
+    assert [rows for phase, rows in progress if phase == 'load'][-1] == VALID_STUDENTS
+
+
+def test_failed_file_rolls_back_in_sql(app, sources, monkeypatch):
+    calls = []
+    transformation = ETL.transformation
+
+    def second_chunk_fails(self, df):
+        calls.append(len(df))
+        if len(calls) == 2:
+            raise RuntimeError("bad chunk")
+        return transformation(self, df)
+
+    with monkeypatch.context() as patched:
+        patched.setattr(ETL, 'transformation', second_chunk_fails)
+        ETL(max_workers=1).run(streaming=True, chunksize=4)
+    # Only part2.csv committed; part1.csv's first chunk rolled back with it.
+    assert [entry.path for entry in IngestedFile.query.all()] == [sources[1]]
+    assert EducationData.query.count() == 4
+    ETL(max_workers=1).run(streaming=True, chunksize=4)
+    assert EducationData.query.count() == VALID_STUDENTS
+
+
+def test_compact_dtypes():
+    frame = pd.DataFrame({
+        'whole': [1.0, 2.0, None, 4.0],
+        'fraction': [1.5, 2.0, 3.0, 4.0],
+        'small': [1, 2, 3, 4],
+        'repeated': ['Low', 'High', 'Low', 'Low'],
+        'unique': ['a', 'b', 'c', 'd'],
+    })
+    compact = compact_dtypes(frame)
+    assert str(compact['whole'].dtype) == 'Int8'
+    assert compact['whole'].isna().tolist() == [False, False, True, False]
+    assert compact['fraction'].dtype == 'float64'
+    assert compact['small'].dtype == 'int8'
+    assert isinstance(compact['repeated'].dtype, pd.CategoricalDtype)
+    assert not isinstance(compact['unique'].dtype, pd.CategoricalDtype)
+    assert compact.astype(object).where(compact.notna(), None).values.tolist() == \
+        frame.astype(object).where(frame.notna(), None).values.tolist()
@@ -0,0 +1,55 @@
+import pytest
+from etl import ETL
+from models import IngestedFile
+from repository import MongoRepository
+from conftest import VALID_STUDENTS
+
+
+def documents(repository):
+    return repository.collection.count_documents({})
+
+
+def test_load_into_mongo(sources, mongo_repository):
+    assert ETL(max_workers=1).run() == VALID_STUDENTS
+    assert documents(mongo_repository) == VALID_STUDENTS
+    assert IngestedFile.query.count() == len(sources)
+    assert ETL(max_workers=1).run() == 0
+
+
+def test_failed_forced_reload_loads_everything_next_run(sources, mongo_repository, monkeypatch):
+    ETL(max_workers=1).run()
+
+    def failing_load(self, frame):
+        raise RuntimeError("mongod went away")
+
+    with monkeypatch.context() as patched, pytest.raises(RuntimeError):
+        patched.setattr(MongoRepository, 'bulk_load', failing_load)
+        ETL(max_workers=1, force=True).run()
+
+    # The documents are gone, so the manifest must not claim the files.
+    assert documents(mongo_repository) == 0
+    assert IngestedFile.query.count() == 0
+    assert ETL(max_workers=1).run() == VALID_STUDENTS
+    assert documents(mongo_repository) == VALID_STUDENTS
+
+
+def test_file_failing_part_way_leaves_no_documents(sources, mongo_repository, monkeypatch):
+    calls = []
+    transformation = ETL.transformation
+
+    def second_chunk_fails(self, df):
+        calls.append(len(df))
+        if len(calls) == 2:
+            raise RuntimeError("bad chunk")
+        return transformation(self, df)
+
+    with monkeypatch.context() as patched:
+        patched.setattr(ETL, 'transformation', second_chunk_fails)
+        ETL(max_workers=1).run(streaming=True, chunksize=4)
+
+    # part1.csv failed after its first chunk loaded; part2.csv loaded.
+    assert [entry.path for entry in IngestedFile.query.all()] == [sources[1]]
+    loaded = documents(mongo_repository)
+    ETL(max_workers=1).run(streaming=True, chunksize=4)
+    assert documents(mongo_repository) == VALID_STUDENTS
+    assert loaded < VALID_STUDENTS
@@ -0,0 +1,33 @@
+import io
+import pandas as pd
+import pyarrow.parquet as pq
+from etl import ETL
+from exports import csv_chunks, parquet_chunks
+from models import EducationData
+from repository import SqlRepository
+from conftest import VALID_STUDENTS
+
+
+def export_parquet(repository):
+    data = b''.join(parquet_chunks(repository.stream_rows(4), EducationData.__table__))
+    return pq.read_table(io.BytesIO(data))
+
+
+def test_mongo_parquet_export(sources, mongo_repository):
+    ETL(max_workers=1).run()
+    table = export_parquet(mongo_repository)
+    assert table.num_rows == VALID_STUDENTS
+    assert str(table.schema.field('physical_activity').type) == 'string'
+    assert str(table.schema.field('hours_studied').type) == 'double'
+    assert table.column('id').to_pylist() == list(range(1, VALID_STUDENTS + 1))
+
+
+def test_mongo_and_sql_exports_match(app, sources, mongo_repository):
+    ETL(max_workers=1).run()
+    app.extensions['repository'] = SqlRepository()
+    ETL(max_workers=1, force=True).run()
+    sql = export_parquet(SqlRepository()).to_pandas()
+    mongo = export_parquet(mongo_repository).to_pandas()
+    pd.testing.assert_frame_equal(sql, mongo)
+    assert (''.join(csv_chunks(SqlRepository().stream_rows(4)))
+            == ''.join(csv_chunks(mongo_repository.stream_rows(4))))
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from filters import Rule, RuleSet
+from etl import TRANSFORM_RULES
+
+FRAME = pd.DataFrame({
+    'id': [1, 2, 3, 4, 5],
+    'hours_studied': [20.0, 0.0, 25.0, np.nan, 18.0],
+    'peer_influence': ['Positive', 'Negative', None, 'Neutral', 'Negative'],
+})
+RULES = [
+    Rule('hours_studied', '>', 0),
+    Rule('hours_studied', '!=', 25.0),
+    Rule('hours_studied', 'between', (10, 20)),
+    Rule('peer_influence', '!=', 'Negative'),
+    Rule('peer_influence', 'in', ['Positive', 'Neutral']),
+    Rule('id', '<=', 3),
+    Rule(None, 'notna'),
+]
+
+
+def test_rejections_counted_once_by_first_rule():
+    rules = RuleSet([Rule('hours_studied', '>', 0), Rule('peer_influence', '!=', 'Negative')])
+    kept, rejected = rules.filter(FRAME)
+    assert kept['id'].tolist() == [1]
+    assert rejected == {'hours_studied > 0': 2, "peer_influence != 'Negative'": 2}
+
+
+def test_missing_values_never_pass():
+    kept, _ = RuleSet([Rule('peer_influence', '!=', 'Negative')]).filter(FRAME)
+    assert kept['id'].tolist() == [1, 4]
+
+
+@pytest.mark.parametrize('rule', RULES, ids=lambda rule: rule.name)
+def test_mongo_query_matches_pandas(rule):
+    mongomock = pytest.importorskip('mongomock')
+    collection = mongomock.MongoClient().db.rules
+    documents = FRAME.rename(columns={'id': '_id'}).astype(object)
+    collection.insert_many(documents.where(documents.notna(), None).to_dict('records'))
+    fields = [name for name in FRAME.columns if name != 'id']
+    matched = sorted(document['_id'] for document in collection.find(RuleSet([rule]).mongo_query(fields)))
+    assert matched == RuleSet([rule]).filter(FRAME)[0]['id'].tolist()
+
+
+def test_transform_rules_on_source_columns():
+    frame = pd.DataFrame({'Hours_Studied': [10, 0, 5], 'Sleep_Hours': [7, 7, None], 'Exam_Score': [60, 70, 80]})
+    kept, rejected = TRANSFORM_RULES.filter(frame)
+    assert len(kept) == 1
+    assert rejected == {'complete row': 1, 'Hours_Studied > 0': 1, 'Sleep_Hours > 0': 0, 'Exam_Score > 0': 0}
@@ -0,0 +1,51 @@
+import pytest
+from html_reader import iter_html_table, read_html_table
+
+PAGE = """<html><body><p>Listings &amp; scores</p>
+<table>
+  <thead><tr><th>name</th><th>score</th><th>note</th></tr></thead>
+  <tbody>
+    <tr><td>Smith &amp; Co</td><td>1.5</td><td>
+      <table><tr><td>nested, ignored</td></tr></table></td></tr>
+    <tr><td>b</td><td>NaN</td><td>x</td></tr>
+    <tr><td>c</td><td>3</td><td></td></tr>
+  </tbody>
+</table>
+<table><tr><th>other</th></tr><tr><td>never read</td></tr></table>
+</body></html>"""
+
+
+@pytest.fixture
+def page(tmp_path):
+    path = tmp_path / 'page.html'
+    path.write_text(PAGE, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('block_size', [1, 7, 1 << 16])
+def test_blocks_split_anywhere(page, block_size):
+    chunks = list(iter_html_table(page, 2, block_size=block_size))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    frame = read_html_table(page)
+    assert list(frame.columns) == ['name', 'score', 'note']
+    assert frame['name'].tolist() == ['Smith & Co', 'b', 'c']
+    assert frame['score'].isna().tolist() == [False, True, False]
+    assert frame['score'].dropna().tolist() == [1.5, 3.0]
+
+
+def test_header_row_without_thead(tmp_path):
+    path = tmp_path / 'plain.html'
+    path.write_text('<table><tr><th>a</th><th>b</th></tr><tr><td>1</td><td>2</td></tr></table>')
+    assert read_html_table(str(path)).values.tolist() == [[1, 2]]
+
+
+def test_usecols(page):
+    frame = read_html_table(page, usecols=lambda name: name != 'note')
+    assert list(frame.columns) == ['name', 'score']
+
+
+def test_no_table(tmp_path):
+    path = tmp_path / 'empty.html'
+    path.write_text('<html><body><p>nothing here</p></body></html>')
+    with pytest.raises(ValueError):
+        read_html_table(str(path))
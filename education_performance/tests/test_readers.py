@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from readers import SourceSchema, get_reader
+
+SCHEMA = SourceSchema({'name': 'category', 'score': 'float64', 'sold': 'datetime'})
+FRAME = pd.DataFrame({
+    'name': ['a', 'b', 'a', 'c', None],
+    'extra': [1, 2, 3, 4, 5],
+    'score': [1.5, 2.0, None, 4.25, 5.0],
+    'sold': pd.to_datetime(['2020-01-02', '2021-03-04', None, '2019-12-31', '2022-06-30']),
+})
+WRITERS = {
+    'csv': lambda frame, path: frame.to_csv(path, index=False),
+    'json': lambda frame, path: frame.to_json(path, orient='records', date_format='iso'),
+    'jsonl': lambda frame, path: frame.to_json(path, orient='records', lines=True, date_format='iso'),
+    'parquet': lambda frame, path: frame.to_parquet(path, index=False),
+    'xlsx': lambda frame, path: frame.to_excel(path, index=False),
+    'html': lambda frame, path: frame.to_html(path, index=False, na_rep=''),
+}
+
+
+@pytest.fixture(params=list(WRITERS))
+def source(request, tmp_path):
+    path = tmp_path / f'source.{request.param}'
+    if request.param == 'jsonl':
+        path = tmp_path / 'source.json'
+    WRITERS[request.param](FRAME, path)
+    return str(path)
+
+
+def values(frame):
+    return frame.astype(object).where(frame.notna(), None).values.tolist()
+
+
+def test_read_projects_and_types(source):
+    frame = get_reader(source, SCHEMA).read(source)
+    assert list(frame.columns) == SCHEMA.columns
+    assert isinstance(frame['name'].dtype, pd.CategoricalDtype)
+    assert frame['score'].dtype == 'float64'
+    assert frame['sold'].dtype.kind == 'M'
+    assert values(frame) == values(FRAME[SCHEMA.columns])
+
+
+def test_chunks_match_read(source):
+    reader = get_reader(source, SCHEMA)
+    chunks = list(reader.iter_chunks(source, 2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert values(pd.concat(chunks)) == values(reader.read(source))
+
+
+def test_missing_column(source):
+    schema = SourceSchema(dict(SCHEMA.dtypes, absent='float64'))
+    with pytest.raises(ValueError, match='absent'):
+        get_reader(source, schema).read(source)
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        get_reader(str(tmp_path / 'source.txt'), SCHEMA)
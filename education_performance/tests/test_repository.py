@@ -0,0 +1,98 @@
+import pandas as pd
+import pytest
+import charts
+from etl import ETL, SCHEMA
+from filters import Rule, RuleSet
+from repository import SqlRepository, StagingRepository
+from conftest import VALID_STUDENTS
+
+FILTERS = RuleSet([Rule('hours_studied', '>=', 20), Rule('peer_influence', 'in', ['Positive', 'Neutral'])])
+METRICS = [('avg', 'exam_score'), ('count', 'id'), ('max', 'sleep_hours')]
+
+
+def rows(frame):
+    """Frame rows as plain values, floats rounded, for comparing stores."""
+    return [[round(float(value), 9) if isinstance(value, (int, float)) else value for value in row]
+            for row in frame.astype(object).values.tolist()]
+
+
+def staging_repository(app):
+    return StagingRepository(app.config['STAGING_DIR'], SCHEMA.columns, charts.staged_rows)
+
+
+@pytest.fixture
+def loaded(app, sources):
+    """Every student in SQL and staged, and the SQL rows as a frame."""
+    ETL(max_workers=1, staging_dir=app.config['STAGING_DIR']).run()
+    return pd.concat(SqlRepository().stream_rows(100), ignore_index=True)
+
+
+@pytest.fixture(params=['mongo', 'staging'])
+def other(request, app, loaded):
+    """Another store with the same rows: Mongo via bulk_load, staging via extraction."""
+    if request.param == 'staging':
+        return staging_repository(app)
+    repository = request.getfixturevalue('mongo_repository')
+    assert repository.bulk_load(loaded) == VALID_STUDENTS
+    return repository
+
+
+@pytest.mark.parametrize('filters', [None, FILTERS])
+def test_aggregate_matches_sql(loaded, other, filters):
+    sql = SqlRepository().aggregate('parental_involvement', METRICS, filters)
+    assert list(other.aggregate('parental_involvement', METRICS, filters).columns) == list(sql.columns)
+    assert rows(other.aggregate('parental_involvement', METRICS, filters)) == rows(sql)
+
+
+def test_aggregate_by_value(loaded, other):
+    sql = SqlRepository().aggregate('distance_from_home', [('count', 'id')], by_value=True)
+    assert rows(other.aggregate('distance_from_home', [('count', 'id')], by_value=True)) == rows(sql)
+    assert sql['count_id'].is_monotonic_decreasing
+
+
+def test_numeric_dimension_types_match(loaded, other):
+    sql = SqlRepository().aggregate('hours_studied', [('avg', 'exam_score')])
+    assert rows(other.aggregate('hours_studied', [('avg', 'exam_score')])) == rows(sql)
+
+
+@pytest.mark.parametrize('limit', [None, 5])
+def test_stream_rows_pages_match_sql(loaded, other, limit):
+    sql = list(SqlRepository().stream_rows(3, FILTERS, limit=limit))
+    pages = list(other.stream_rows(3, FILTERS, limit=limit))
+    assert [len(page) for page in pages] == [len(page) for page in sql]
+    # Staged ids count rejected rows too, so only the values are compared.
+    assert rows(pd.concat(pages).drop(columns='id')) == rows(pd.concat(sql).drop(columns='id'))
+    assert list(pages[0].columns) == list(sql[0].columns)
+
+
+@pytest.mark.parametrize('after', [1, 4, 100])
+def test_stream_rows_resumes_after_id(loaded, other, after):
+    every = pd.concat(other.stream_rows(100), ignore_index=True)
+    after_id = every['id'].iloc[min(after, len(every)) - 1]
+    rest = pd.concat(other.stream_rows(3, after_id=after_id), ignore_index=True)
+    assert rows(rest) == rows(every[every['id'] > after_id])
+
+
+def test_clear(loaded, mongo_repository):
+    mongo_repository.bulk_load(loaded)
+    mongo_repository.clear()
+    assert mongo_repository.aggregate('peer_influence', METRICS).empty
+    assert [len(page) for page in mongo_repository.stream_rows(5)] == [0]
+
+
+def test_discard_since(loaded, mongo_repository):
+    mongo_repository.bulk_load(loaded)
+    checkpoint = mongo_repository.checkpoint()
+    mongo_repository.bulk_load(loaded)
+    assert len(pd.concat(mongo_repository.stream_rows(100))) == 2 * VALID_STUDENTS
+    mongo_repository.discard_since(checkpoint)
+    assert len(pd.concat(mongo_repository.stream_rows(100))) == VALID_STUDENTS
+
+
+def test_staging_is_read_only(app, loaded):
+    staging = staging_repository(app)
+    with pytest.raises(TypeError):
+        staging.bulk_load(loaded)
+    with pytest.raises(TypeError):
+        staging.clear()
+    assert len(pd.concat(staging.stream_rows(4))) == VALID_STUDENTS
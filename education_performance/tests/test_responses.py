@@ -0,0 +1,79 @@
+import base64
+import gzip
+import json
+import numpy as np
+import pytest
+from flask import Flask
+from charts import encode_array
+from responses import MIN_COMPRESS_SIZE, json_response
+
+LARGE = json.dumps({'x': list(range(200))})
+
+
+@pytest.fixture
+def web():
+    return Flask(__name__)
+
+
+def respond(web, payload, **headers):
+    with web.test_request_context(headers=headers):
+        return json_response(payload)
+
+
+def test_small_payload_uncompressed(web):
+    response = respond(web, '{"a": 1}', **{'Accept-Encoding': 'gzip'})
+    assert response.content_encoding is None
+    assert response.get_data(as_text=True) == '{"a": 1}'
+    assert response.cache_control.no_cache and response.cache_control.private
+    assert 'Accept-Encoding' in response.vary
+
+
+def test_gzip(web):
+    assert len(LARGE) >= MIN_COMPRESS_SIZE
+    response = respond(web, LARGE, **{'Accept-Encoding': 'gzip'})
+    assert response.content_encoding == 'gzip'
+    assert gzip.decompress(response.get_data()).decode() == LARGE
+    assert response.get_etag()[0].endswith('-gzip')
+
+
+def test_brotli(web):
+    brotli = pytest.importorskip('brotli')
+    response = respond(web, LARGE, **{'Accept-Encoding': 'gzip, br'})
+    assert response.content_encoding == 'br'
+    assert brotli.decompress(response.get_data()).decode() == LARGE
+
+
+def test_etag_revalidation(web):
+    etag = respond(web, LARGE, **{'Accept-Encoding': 'gzip'}).get_etag()[0]
+    response = respond(web, LARGE, **{'Accept-Encoding': 'gzip', 'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    # The identity representation has its own tag, so it is not a match.
+    assert respond(web, LARGE, **{'If-None-Match': f'"{etag}"'}).status_code == 200
+    assert respond(web, LARGE.replace('199', '200'), **{'Accept-Encoding': 'gzip',
+                                                       'If-None-Match': f'"{etag}"'}).status_code == 200
+
+
+@pytest.mark.parametrize('values, dtype', [
+    ([1, 2, 3], 'i4'),
+    ([1.5, -2.25], 'f8'),
+    ([2**40, 1], 'f8'),
+])
+def test_encode_array_numbers(values, dtype):
+    encoded = encode_array(np.array(values))
+    assert encoded['dtype'] == dtype
+    assert np.frombuffer(base64.b64decode(encoded['data']), dtype='<' + dtype).tolist() == values
+
+
+def test_encode_array_labels():
+    assert encode_array(np.array(['Low', 'High'], dtype=object)) == ['Low', 'High']
+
+
+def test_chart_revalidates_with_304(client, login):
+    login('admin')
+    url = client.get('/api/charts').get_json()[0]['url']
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    again = client.get(url, headers={'If-None-Match': etag})
+    assert again.status_code == 304
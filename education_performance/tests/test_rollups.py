@@ -0,0 +1,61 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import repository
+from etl import ETL
+from extensions import db
+from models import EducationData, EducationRollup
+from queries import run_group_by
+from repository import SqlRepository
+from rollups import ROLLUP_DIMENSIONS, rollup_key
+from conftest import STUDENTS, SOURCE_COLUMNS
+
+METRICS = [('avg', 'exam_score'), ('avg', 'sleep_hours')]
+
+
+def rows(frame):
+    return [[round(float(value), 9) if isinstance(value, (int, float)) else value for value in row]
+            for row in frame.astype(object).values.tolist()]
+
+
+def assert_rollups_match_group_by():
+    assert EducationRollup.query.count() > 0
+    for dimension in ROLLUP_DIMENSIONS:
+        rolled_up = SqlRepository().aggregate(dimension, METRICS)
+        grouped = run_group_by(EducationData, dimension, METRICS)
+        assert rows(rolled_up) == rows(grouped), dimension
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_rollups_match_group_by(app, sources, streaming):
+    ETL(max_workers=1).run(streaming=streaming, chunksize=4)
+    assert_rollups_match_group_by()
+
+
+def test_forced_reload_replaces_rollups(app, sources):
+    ETL(max_workers=1).run()
+    ETL(max_workers=1, force=True).run(streaming=True, chunksize=4)
+    assert_rollups_match_group_by()
+
+
+def test_missing_rollups_rebuilt_once_per_run(app, sources, monkeypatch):
+    ETL(max_workers=1).run()
+    EducationRollup.query.delete()
+    db.session.commit()
+    pd.DataFrame(STUDENTS[:5], columns=SOURCE_COLUMNS).to_csv(
+        os.path.join('data_sources', 'part3.csv'), index=False)
+    checks = []
+    missing = repository.rollups_missing
+    monkeypatch.setattr(repository, 'rollups_missing', lambda: checks.append(1) or missing())
+    ETL(max_workers=1).run(streaming=True, chunksize=2)
+    assert len(checks) == 1
+    assert_rollups_match_group_by()
+
+
+def test_rollup_keys_are_exact():
+    assert rollup_key(7.1234567) != rollup_key(7.1234568)
+    for value in (7.1234567, 0.1, 1e-7, 123456789.25, np.float64(2.5)):
+        assert float(rollup_key(value)) == value
+    assert rollup_key(23.0) == rollup_key(23) == rollup_key(np.int64(23)) == '23'
+    assert rollup_key('Near') == 'Near'
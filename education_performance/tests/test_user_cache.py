@@ -0,0 +1,57 @@
+from extensions import backends, db, user_cache
+from models import User
+from user_cache import UserCache
+
+
+class Loads:
+    """A loader that counts its calls and returns a fresh User."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, user_id):
+        self.count += 1
+        return User(id=user_id, username=f'user{user_id}', email='u@example.com', role='viewer')
+
+
+def test_loads_once_within_ttl():
+    cache, load = UserCache(), Loads()
+    assert cache.get_or_load(1, load).username == 'user1'
+    assert cache.get_or_load(1, load).username == 'user1'
+    assert load.count == 1
+
+
+def test_expired_entry_reloaded():
+    cache, load = UserCache(), Loads()
+    cache.ttl = -1
+    cache.get_or_load(1, load)
+    assert cache.get(1) is None
+    cache.get_or_load(1, load)
+    assert load.count == 2
+
+
+def test_least_recently_used_evicted():
+    cache, load = UserCache(), Loads()
+    cache.max_entries = 2
+    for user_id in (1, 2, 1, 3):
+        cache.get_or_load(user_id, load)
+    assert cache.get(2) is None
+    assert cache.get(1) is not None and cache.get(3) is not None
+
+
+def test_unknown_user_not_cached():
+    cache = UserCache()
+    assert cache.get_or_load(1, lambda user_id: None) is None
+    assert cache.get(1) is None
+
+
+def test_role_change_invalidates(client, login):
+    login('viewer')
+    assert client.get('/switch_database?backend=sqlite').status_code == 302
+    with client.application.app_context():
+        user = User.query.filter_by(username='viewer').one()
+        key = (backends.current(db.session), user.id)
+        assert user_cache.get(key).role == 'viewer'
+        user.role = 'admin'
+        db.session.commit()
+        assert user_cache.get(key) is None
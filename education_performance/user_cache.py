@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from flask_login import UserMixin
+
+
+class CachedUser(UserMixin):
+    """The identity fields requests need, detached from any session."""
+
+    def __init__(self, id, username, email, role):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = role
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.email, user.role)
+
+
+class UserCache:
+    """TTL-bounded LRU of CachedUser keyed by user id.
+
+    load_user runs on every authenticated request, chart fetches included;
+    with this cache it reaches the database once per user per ``ttl``
+    seconds. User inserts, updates and deletes invalidate their entry (see
+    the listeners in models.py), and the TTL bounds how long another worker
+    process can keep serving a stale role.
+    """
+
+    def __init__(self, app=None):
+        self.max_entries = 1024
+        self.ttl = 60
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('USER_CACHE_SIZE', 1024)
+        self.ttl = app.config.get('USER_CACHE_TTL', 60)
+        app.extensions['user_cache'] = self
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return user
+
+    def get_or_load(self, user_id, load):
+        user = self.get(user_id)
+        if user is None:
+            found = load(user_id)
+            if found is None:
+                return None
+            user = self.set(user_id, CachedUser.from_user(found))
+        return user
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,36 @@
+import pandas as pd
+
+DEFAULT_STATS = ('count', 'sum', 'mean', 'min', 'max')
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75)
+
+
+def quantile_label(q):
+    return 'q%g' % (q * 100)
+
+
+def grouped_aggregate(df, pairs, stats=DEFAULT_STATS, quantiles=DEFAULT_QUANTILES):
+    """Aggregate several (group column, value column) pairs in one pass per group column.
+
+    Pairs sharing a group column are reduced by a single groupby, so the
+    ``state`` charts for price and house size only factorize ``state`` once.
+    Returns a dict keyed by the pair, each value a frame indexed by group with
+    one column per statistic (quantiles are named ``q25``, ``q50``, ...).
+    """
+    by_group = {}
+    for group_col, value_col in pairs:
+        value_cols = by_group.setdefault(group_col, [])
+        if value_col not in value_cols:
+            value_cols.append(value_col)
+
+    results = {}
+    for group_col, value_cols in by_group.items():
+        grouped = df.groupby(group_col, sort=True, observed=True)[value_cols]
+        table = grouped.agg(list(stats)) if stats else None
+        if quantiles:
+            q = grouped.quantile(list(quantiles)).unstack()
+            q.columns = pd.MultiIndex.from_tuples(
+                [(value_col, quantile_label(level)) for value_col, level in q.columns])
+            table = q if table is None else table.join(q)
+        for value_col in value_cols:
+            results[(group_col, value_col)] = table[value_col]
+    return results
@@ -1,16 +1,19 @@
-from flask import Flask, render_template, redirect, url_for, flash, request
+from flask import Flask, render_template, redirect, url_for, flash, request, jsonify, stream_with_context
 import os
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-import plotly.express as px
-import plotly.utils
 import json
-from forms import LoginForm, RegistrationForm
+from forms import LoginForm, RegistrationForm, DashboardFilterForm
 from flask_migrate import Migrate
-import pandas as pd
-from config import MySQLConfig, PostgresConfig
 from models import User, RealEstateData
-from extensions import db
-from etl import RealEstateETL
+from extensions import db, backends, chart_cache, jobs, user_cache, password_hasher
+from backends import BackendUnavailable
+from passwords import HasherBusy
+from jobs import JobAlreadyRunning
+from etl import RealEstateETL, CHUNK_SIZE
+from charts import CHARTS_BY_ID, charts_for_role, render_chart, chart_payload, shared_layout_json, chart_key, state_names
+from repository import get_repository, records
+from exports import csv_chunks, parquet_chunks
+from responses import json_response
 import logging
 from logging.handlers import RotatingFileHandler
 
@@ -29,30 +32,28 @@ console_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s: %(mes
 logger.addHandler(console_handler)
 
 app = Flask(__name__)
-app.config.from_object('config.MySQLConfig')  
+app.config.from_object(os.environ.get('APP_CONFIG', 'config.MySQLConfig'))
 db.init_app(app)
+backends.init_app(app, db)
+chart_cache.init_app(app)
+jobs.init_app(app)
+user_cache.init_app(app)
+password_hasher.init_app(app)
 migrate = Migrate(app, db)
 
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
-def avg_val(col_name1, df, col_name2):
-        x_axis = set(df[col_name1])
-        d1, d = dict(), dict()
-        for i in x_axis:
-            d[i] = 0
-            d1[i] = 0
-        for i in df.index:
-            d[df[col_name1][i]] += df[col_name2][i]
-            d1[df[col_name1][i]] += 1
-        for i in d.keys():
-            d[i] /= d1[i]
-        return d
+def cached(key, build, *args):
+    # Backends hold different data, so each gets its own cache entries.
+    return chart_cache.get_or_set(f'{backends.current(db.session)}-{key}', build, *args)
 
 @login_manager.user_loader
 def load_user(id):
-    return User.query.get(int(id))
+    # Each backend numbers its users independently.
+    key = (backends.current(db.session), int(id))
+    return user_cache.get_or_load(key, lambda key: db.session.get(User, key[1]))
 
 @app.route('/')
 @login_required
@@ -64,7 +65,16 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(username=form.username.data).first()
-        if user and user.check_password(form.password.data):
+        try:
+            valid = user is not None and user.check_password(form.password.data)
+            if valid and user.password_needs_rehash():
+                # PASSWORD_HASH_METHOD changed since this hash was made.
+                user.set_password(form.password.data)
+                db.session.commit()
+        except HasherBusy:
+            flash('Too many sign-in attempts right now, please try again shortly')
+            return render_template('login.html', form=form), 503
+        if valid:
             login_user(user)
             if user.role=='admin':
                 return redirect(url_for('admin_dashboard'))
@@ -81,77 +91,63 @@ def register():
             email=form.email.data,
             role=form.role.data
         )
-        user.set_password(form.password.data)
+        try:
+            user.set_password(form.password.data)
+        except HasherBusy:
+            flash('Too many requests right now, please try again shortly')
+            return render_template('register.html', form=form), 503
         db.session.add(user)
         db.session.commit()
         flash('Registration successful')
         return redirect(url_for('login'))
     return render_template('register.html', form=form)
 
+def dashboard_filters(formdata):
+    form = DashboardFilterForm(formdata=formdata)
+    form.state.choices = [('', 'All states')] + [
+        (state, state) for state in json.loads(cached('states', state_names))]
+    return form
+
 @app.route('/dashboard',methods=['GET', 'POST'])
 @login_required
 def dashboard():
-    real_estate_data = RealEstateData.query.all()
-    df = pd.DataFrame([{
-        'price': data.price,
-        'bed': data.bed,
-        'bath': data.bath,
-        'state': data.state,
-        'house_size': data.house_size,
-        'day': data.day,
-        'month': data.month,
-        'year': data.year
-    } for data in real_estate_data])
-    print(df.head())
-    charts = []
-    
-    
-    if current_user.role in ['admin', 'analyst', 'researcher']:
-        bed_avg_price = avg_val('bed', df, 'price')
-        fig1 = px.bar(x=list(bed_avg_price.keys()), y=list(bed_avg_price.values()),
-                      labels={'x': 'Number of Beds', 'y': 'Average Price'},
-                      title='Number of Beds vs Average Price')
-        charts.append(json.dumps(fig1, cls=plotly.utils.PlotlyJSONEncoder))
-
-        bath_avg_price = avg_val('bath', df, 'price')
-        fig2 = px.bar(x=list(bath_avg_price.keys()), y=list(bath_avg_price.values()),
-                      labels={'x': 'Number of Baths', 'y': 'Average Price'},
-                      title='Number of Baths vs Average Price')
-        charts.append(json.dumps(fig2, cls=plotly.utils.PlotlyJSONEncoder))
-
-        state_avg_price = avg_val('state', df, 'price')
-        fig3 = px.bar(x=list(state_avg_price.keys()), y=list(state_avg_price.values()),
-                      labels={'x': 'State', 'y': 'Average Price'},
-                      title='State vs Average Price')
-        charts.append(json.dumps(fig3, cls=plotly.utils.PlotlyJSONEncoder))
-
-        state_avg_size = avg_val('state', df, 'house_size')
-        fig4 = px.bar(x=list(state_avg_size.keys()), y=list(state_avg_size.values()),
-                      labels={'x': 'State', 'y': 'Average House Size'},
-                      title='State vs Average House Size')
-        charts.append(json.dumps(fig4, cls=plotly.utils.PlotlyJSONEncoder))
-
-        state_count = df['state'].value_counts()
-        fig5 = px.bar(x=state_count.index, y=state_count.values,
-                      labels={'x': 'State', 'y': 'Count'},
-                      title='State vs Count of Listings')
-        charts.append(json.dumps(fig5, cls=plotly.utils.PlotlyJSONEncoder))
-
-        month_total_price = df.groupby('month')['price'].sum()
-        fig6 = px.line(x=month_total_price.index, y=month_total_price.values,
-                       labels={'x': 'Month', 'y': 'Total Price'},
-                       title='Month Sold vs Total Price')
-        charts.append(json.dumps(fig6, cls=plotly.utils.PlotlyJSONEncoder))
-    
-    elif current_user.role == 'validator':
-        charts = charts[:2]
-    
-    elif current_user.role == 'viewer':
-        charts = [charts[0]]
-    
-    return render_template('dashboard.html', charts=charts)
+    # Only the page shell: each chart is fetched from dashboard_chart, so
+    # the first byte never waits on a figure.
+    form = dashboard_filters(request.values)
+    params = {}
+    if form.validate():
+        params = {name: value for name, value in request.values.items()
+                  if value and name in form and name != 'submit'}
+    charts = [(chart, url_for('dashboard_chart', chart_id=chart.chart_id, **params))
+              for chart in charts_for_role(current_user.role)]
+    return render_template('dashboard.html', charts=charts, form=form)
+
+def chart_request(chart_id):
+    """The chart and filter rules a chart request asks for, or an error response."""
+    chart = CHARTS_BY_ID.get(chart_id)
+    if chart is None:
+        return None, None, (jsonify({'error': 'Unknown chart id'}), 404)
+    if chart not in charts_for_role(current_user.role):
+        return None, None, (jsonify({'error': 'Chart not available for your role'}), 403)
+    form = dashboard_filters(request.args)
+    if not form.validate():
+        return None, None, (jsonify({'error': 'Invalid filters', 'fields': form.errors}), 400)
+    return chart, form.rules(), None
 
+@app.route('/dashboard/layout')
+@login_required
+def dashboard_layout():
+    # Fixed for the life of the process, so browsers may reuse it for a day.
+    return json_response(shared_layout_json(), max_age=86400)
 
+@app.route('/dashboard/charts/<chart_id>')
+@login_required
+def dashboard_chart(chart_id):
+    chart, rules, error = chart_request(chart_id)
+    if error:
+        return error
+    payload = cached('chart-' + chart_key(chart, rules), render_chart, chart, rules)
+    return json_response(payload)
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
@@ -171,27 +167,99 @@ def upload_file():
     file.save(file_path)
     flash("File uploaded successfully.")
     return redirect(url_for('admin_portal'))
-@app.route('/etl', methods=['GET','POST'])
-def etl():
-    etl_process = RealEstateETL()
-
+def run_etl(job, force):
+    etl_process = RealEstateETL(max_workers=app.config.get('ETL_MAX_WORKERS'), force=force,
+                                progress=job.update, staging_dir=app.config.get('STAGING_DIR'))
     try:
-        logger.info("Starting ETL process")
-        data = etl_process.extract_data()
-        logger.debug(f"Extracted {len(data)} records")
+        logger.info(f"Starting ETL job {job.job_id}")
+        rows = etl_process.run(streaming=app.config.get('ETL_MODE') == 'streaming',
+                               chunksize=app.config.get('ETL_CHUNK_SIZE', CHUNK_SIZE))
+        logger.info(f"ETL job {job.job_id} completed successfully, loaded {rows} records")
+    except Exception as e:
+        logger.error(f"ETL job {job.job_id} failed: {e}")
+        raise
 
-        transformed_data = etl_process.transformation(data)
-        logger.debug(f"Transformed {len(transformed_data)} records")
+def wants_json():
+    return request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
 
-        etl_process.load_data(transformed_data)
-        logger.info("ETL process completed successfully")
-        flash("ETL process completed successfully.")
-    except Exception as e:
-        logger.error(f"ETL process failed: {e}")
-        flash(f"ETL process failed: {e}")
+@app.route('/etl', methods=['POST'])
+@login_required
+def etl():
+    if current_user.role != 'admin':
+        if wants_json():
+            return jsonify({'error': 'Permission denied'}), 403
+        flash('Permission denied')
+        return redirect(url_for('dashboard'))
+    try:
+        job = jobs.submit('etl', run_etl, request.values.get('full') == '1')
+        message, status = f"ETL job {job.job_id} started.", 202
+    except JobAlreadyRunning as e:
+        job = e.job
+        message, status = f"ETL job {job.job_id} is already running.", 409
+    logger.info(message)
 
+    if wants_json():
+        return jsonify(job.to_dict()), status
+    flash(message)
     return redirect(url_for('admin_portal'))
 
+@app.route('/etl/status/<job_id>')
+@login_required
+def etl_status(job_id):
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Permission denied'}), 403
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/charts')
+@login_required
+def api_charts():
+    return jsonify([{'chart_id': chart.chart_id, 'title': chart.title,
+                     'url': url_for('api_chart', chart_id=chart.chart_id)}
+                    for chart in charts_for_role(current_user.role)])
+
+@app.route('/api/charts/<chart_id>')
+@login_required
+def api_chart(chart_id):
+    chart, rules, error = chart_request(chart_id)
+    if error:
+        return error
+    payload = cached('api-' + chart_key(chart, rules), chart_payload, chart, rules)
+    return json_response(payload)
+
+@app.route('/api/rows')
+@login_required
+def api_rows():
+    form = dashboard_filters(request.args)
+    if not form.validate():
+        return jsonify({'error': 'Invalid filters', 'fields': form.errors}), 400
+    limit = max(min(request.args.get('limit', app.config['API_PAGE_SIZE'], type=int),
+                    app.config['API_PAGE_SIZE_MAX']), 1)
+    frames = get_repository().stream_rows(limit, filters=form.rules(),
+                                          after_id=request.args.get('after_id', 0, type=int), limit=limit)
+    rows = records(next(frames))
+    frames.close()
+    next_after_id = rows[-1]['id'] if len(rows) == limit else None
+    return jsonify({'rows': rows, 'next_after_id': next_after_id})
+
+@app.route('/api/export.<fmt>')
+@login_required
+def api_export(fmt):
+    if fmt not in ('csv', 'parquet'):
+        return jsonify({'error': 'Unsupported export format'}), 404
+    form = dashboard_filters(request.args)
+    if not form.validate():
+        return jsonify({'error': 'Invalid filters', 'fields': form.errors}), 400
+    frames = get_repository().stream_rows(app.config['EXPORT_BATCH_SIZE'], filters=form.rules())
+    if fmt == 'csv':
+        body, mimetype = csv_chunks(frames), 'text/csv'
+    else:
+        body, mimetype = parquet_chunks(frames, RealEstateData.__table__), 'application/vnd.apache.parquet'
+    return app.response_class(stream_with_context(body), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=real_estate_data.{fmt}'})
+
 @app.route('/admin_portal')
 def admin_portal():
     return render_template('admin.html')
@@ -205,16 +273,16 @@ def switch_database():
     if current_user.role != 'admin':
         flash('Permission denied')
         return redirect(url_for('dashboard'))
-    
-    current_db = 'mysql' if 'mysql' in app.config['SQLALCHEMY_DATABASE_URI'] else 'postgresql'
-    new_config = MySQLConfig if current_db == 'postgresql' else PostgresConfig
-    app.config.from_object(new_config)
-    
-    db.session.remove()
-    db.init_app(app)
-    
-    flash(f'Switched to {new_config.__name__}')
+    # Requests already running finish on the backend they started with.
+    name = request.args.get('backend') or backends.next_backend()
+    try:
+        backends.switch(name)
+    except BackendUnavailable as e:
+        flash(str(e))
+        return redirect(url_for('dashboard'))
+    flash(f'Switched to {name}')
     return redirect(url_for('dashboard'))
+
 @app.route('/logout')
 @login_required
 def logout():
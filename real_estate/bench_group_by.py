@@ -0,0 +1,92 @@
+"""Time the dashboard GROUP BY queries on SQLite with and without indexes.
+
+    python bench_group_by.py --rows 1000000
+
+Builds a throwaway database of synthetic listings, runs every chart query
+against the bare table, adds the model's indexes and runs them again.
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from sqlalchemy import create_engine
+from models import RealEstateData
+from queries import group_by_statement
+from charts import CHARTS
+
+STATES = ['Massachusetts', 'New Jersey', 'New York', 'Connecticut', 'Pennsylvania',
+          'Rhode Island', 'Vermont', 'Maine', 'New Hampshire', 'Delaware']
+
+
+def fill(engine, rows, batch_size=100000):
+    table = RealEstateData.__table__
+    rng = np.random.default_rng(0)
+    with engine.begin() as connection:
+        for start in range(0, rows, batch_size):
+            n = min(batch_size, rows - start)
+            columns = {
+                'price': rng.integers(50000, 2000000, n).astype(float),
+                'bed': rng.integers(1, 11, n).astype(float),
+                'bath': rng.integers(1, 11, n).astype(float),
+                'state': rng.choice(STATES, n),
+                'house_size': rng.integers(400, 6000, n).astype(float),
+                'day': rng.integers(1, 29, n),
+                'month': rng.integers(1, 13, n),
+                'year': rng.integers(1970, 2025, n),
+            }
+            records = [dict(zip(columns, values)) for values in
+                       zip(*(column.tolist() for column in columns.values()))]
+            connection.execute(table.insert(), records)
+
+
+def time_charts(engine, repeat):
+    timings = {}
+    with engine.connect() as connection:
+        for chart in CHARTS:
+            stmt = group_by_statement(RealEstateData, chart.group_by,
+                                      [(chart.aggregate, chart.metric)], chart.by_value)
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                connection.execute(stmt).all()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[chart.chart_id] = best
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    table = RealEstateData.__table__
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine('sqlite:///' + os.path.join(tmp, 'bench.db'))
+        table.create(engine)
+        for index in table.indexes:
+            index.drop(engine)
+        start = time.perf_counter()
+        fill(engine, args.rows)
+        print(f"loaded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        bare = time_charts(engine, args.repeat)
+        start = time.perf_counter()
+        for index in table.indexes:
+            index.create(engine)
+        with engine.begin() as connection:
+            connection.exec_driver_sql('ANALYZE')
+        print(f"built {len(table.indexes)} indexes in {time.perf_counter() - start:.1f}s")
+        indexed = time_charts(engine, args.repeat)
+
+        print(f"{'chart':<20}{'no index ms':>14}{'indexed ms':>14}{'speedup':>10}")
+        for chart_id in bare:
+            print(f"{chart_id:<20}{bare[chart_id] * 1000:>14.1f}{indexed[chart_id] * 1000:>14.1f}"
+                  f"{bare[chart_id] / indexed[chart_id]:>9.1f}x")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+import base64
+import json
+import numpy as np
+import plotly.io as pio
+import plotly.utils
+from flask import current_app
+from repository import StagingRepository, get_repository
+from etl import RealEstateETL, SCHEMA
+
+
+class Chart:
+    def __init__(self, chart_id, title, group_by, metric, aggregate, x_label, y_label,
+                 kind='bar', by_value=False):
+        self.chart_id = chart_id
+        self.title = title
+        self.group_by = group_by
+        self.metric = metric
+        self.aggregate = aggregate
+        self.x_label = x_label
+        self.y_label = y_label
+        self.kind = kind
+        self.by_value = by_value
+
+
+CHARTS = [
+    Chart('bed_avg_price', 'Number of Beds vs Average Price',
+          'bed', 'price', 'avg', 'Number of Beds', 'Average Price'),
+    Chart('bath_avg_price', 'Number of Baths vs Average Price',
+          'bath', 'price', 'avg', 'Number of Baths', 'Average Price'),
+    Chart('state_avg_price', 'State vs Average Price',
+          'state', 'price', 'avg', 'State', 'Average Price'),
+    Chart('state_avg_size', 'State vs Average House Size',
+          'state', 'house_size', 'avg', 'State', 'Average House Size'),
+    Chart('state_count', 'State vs Count of Listings',
+          'state', 'id', 'count', 'State', 'Count', by_value=True),
+    Chart('month_total_price', 'Month Sold vs Total Price',
+          'month', 'price', 'sum', 'Month', 'Total Price', kind='line'),
+]
+CHARTS_BY_ID = {chart.chart_id: chart for chart in CHARTS}
+# Chart ids each role may see; unknown roles get the viewer's.
+ROLE_CHARTS = {
+    'admin': [chart.chart_id for chart in CHARTS],
+    'analyst': [chart.chart_id for chart in CHARTS],
+    'researcher': [chart.chart_id for chart in CHARTS],
+    'validator': ['bed_avg_price', 'bath_avg_price'],
+    'viewer': ['bed_avg_price'],
+}
+
+
+def charts_for_role(role):
+    return [CHARTS_BY_ID[chart_id] for chart_id in ROLE_CHARTS.get(role, ROLE_CHARTS['viewer'])]
+
+
+# Layout every chart shares, including Plotly's default template. The
+# dashboard fetches it once; each chart payload then carries only its own
+# title, axis labels and data.
+SHARED_LAYOUT = {
+    'template': pio.templates[pio.templates.default].to_plotly_json(),
+    'legend': {'tracegroupgap': 0},
+    'margin': {'t': 60},
+    'barmode': 'relative',
+}
+INT32 = np.iinfo(np.int32)
+
+
+def shared_layout_json():
+    return json.dumps(SHARED_LAYOUT, cls=plotly.utils.PlotlyJSONEncoder)
+
+
+def encode_array(values):
+    """Numbers as a base64 little-endian typed array, anything else as a list."""
+    array = np.asarray(values)
+    if array.dtype.kind in 'biu' and (not len(array) or INT32.min <= array.min() <= array.max() <= INT32.max):
+        return {'dtype': 'i4', 'data': base64.b64encode(array.astype('<i4').tobytes()).decode()}
+    if array.dtype.kind in 'biuf':
+        return {'dtype': 'f8', 'data': base64.b64encode(array.astype('<f8').tobytes()).decode()}
+    return array.tolist()
+
+
+def staged_rows(chunk):
+    return SCHEMA.to_model(RealEstateETL().transformation(chunk))
+
+
+def dashboard_repository():
+    if current_app.config.get('DASHBOARD_SOURCE') == 'staging':
+        return StagingRepository(current_app.config['STAGING_DIR'], SCHEMA.columns, staged_rows)
+    return get_repository()
+
+
+def chart_data(chart, rules=None):
+    """Aggregate one chart, restricted to the rows ``rules`` (a RuleSet) keeps."""
+    # On SQL, year bounds become year >= / <= criteria, which PostgreSQL
+    # uses to prune partitions.
+    frame = dashboard_repository().aggregate(chart.group_by, [(chart.aggregate, chart.metric)],
+                                             filters=rules, by_value=chart.by_value)
+    frame.columns = ['x', 'y']
+    frame['y'] = frame['y'].astype(float)
+    return frame
+
+
+def compact_chart(chart, data):
+    return json.dumps({'chart_id': chart.chart_id, 'title': chart.title, 'kind': chart.kind,
+                       'x_label': chart.x_label, 'y_label': chart.y_label,
+                       'x': encode_array(data['x']), 'y': encode_array(data['y'])})
+
+
+def render_chart(chart, rules=None):
+    return compact_chart(chart, chart_data(chart, rules))
+
+
+def chart_payload(chart, rules=None):
+    data = chart_data(chart, rules)
+    return json.dumps({'chart_id': chart.chart_id, 'title': chart.title,
+                       'x_label': chart.x_label, 'y_label': chart.y_label,
+                       'x': data['x'].tolist(), 'y': data['y'].tolist()})
+
+
+def chart_key(chart, rules=None):
+    if rules is None or not rules.rules:
+        return chart.chart_id
+    return f'{chart.chart_id}-{rules.key()}'
+
+
+def state_names():
+    states = dashboard_repository().aggregate('state', [('count', 'id')])
+    return json.dumps(states['state'].tolist())
@@ -1,7 +1,15 @@
 import pandas as pd
-from extensions import db
-from models import RealEstateData
+from readers import SourceSchema, get_reader
+from filters import Rule, RuleSet
+from extensions import db, chart_cache
+from models import IngestedFile
+from repository import get_repository
+from manifest import pending_files, record_ingested
+from staging import is_fresh, stage_file, staged_path, read_staged, iter_staged
+from itertools import repeat
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 import logging
 from logging.handlers import RotatingFileHandler
 
@@ -17,70 +25,266 @@ console_handler.setLevel(logging.DEBUG)
 console_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s: %(message)s'))
 logger.addHandler(console_handler)
 
+COLUMNS = ['price', 'bed', 'bath', 'state', 'house_size', 'day', 'month', 'year']
+
+CHUNK_SIZE = 50000
+# Source columns that transformation and load_data actually use; readers
+# drop the rest. The source names already match the model's.
+SCHEMA = SourceSchema({
+    'status': 'category',
+    'price': 'float64',
+    'bed': 'float64',
+    'bath': 'float64',
+    'state': 'category',
+    'house_size': 'float64',
+    'prev_sold_date': 'datetime',
+})
+# Just the sale dates, which give the years a load needs partitions for.
+DATE_SCHEMA = SourceSchema({'prev_sold_date': SCHEMA.dtypes['prev_sold_date']})
+
 def read_file(file_path):
-    if file_path.endswith('.csv'):
-        return pd.read_csv(file_path)
-    elif file_path.endswith('.xlsx') or file_path.endswith('.xls'):
-        return pd.read_excel(file_path)
-    elif file_path.endswith('.json'):
-        return pd.read_json(file_path)
-    elif file_path.endswith('.parquet'):
-        return pd.read_parquet(file_path)
-    else:
-        raise ValueError("Unsupported file format")
+    return get_reader(file_path, SCHEMA).read(file_path)
+
+def iter_file(file_path, chunksize=CHUNK_SIZE):
+    """Return an iterator over a source file in frames of at most ``chunksize`` rows."""
+    return get_reader(file_path, SCHEMA).iter_chunks(file_path, chunksize)
+
+# Rows that survive transformation, checked in this order.
+TRANSFORM_RULES = RuleSet([
+    Rule(None, 'notna'),
+    Rule('status', '==', 'for_sale'),
+    Rule('bed', 'between', (1, 10)),
+    Rule('bath', 'between', (1, 10)),
+    Rule('price', '>', 0),
+])
+
+# Strings with no more distinct values than this share of the rows become
+# categoricals; status and state qualify.
+CATEGORY_RATIO = 0.5
+
+def compact_dtypes(df):
+    """Shrink a frame before filtering: smallest integer types, categorical strings."""
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        kind = series.dtype.kind
+        if kind == 'f':
+            values = series.dropna()
+            if len(values) and (values % 1 == 0).all():
+                series = series.astype('Int64')
+                kind = 'i'
+        if kind in 'iu':
+            series = pd.to_numeric(series, downcast='integer')
+        elif kind == 'O' and not isinstance(series.dtype, pd.CategoricalDtype):
+            if series.nunique() <= CATEGORY_RATIO * len(series):
+                series = series.astype('category')
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index)
 
 def convert_datetime(df):
-    df['prev_sold_date'] = pd.to_datetime(df['prev_sold_date'], errors='coerce')
-    return df
+    return df.assign(prev_sold_date=pd.to_datetime(df['prev_sold_date'], errors='coerce'))
+
+def source_files(directory='data_sources'):
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            paths.append(os.path.join(root, file))
+    return sorted(paths)
+
+def stage_source(file_path, staging_dir, chunksize=CHUNK_SIZE):
+    if not is_fresh(file_path, staging_dir, SCHEMA.dtypes):
+        stage_file(file_path, staging_dir, iter_file(file_path, chunksize), SCHEMA.dtypes)
+    return staged_path(file_path, staging_dir)
+
+def read_source(file_path, staging_dir=None):
+    # Runs in a worker process, so failures travel back as plain strings.
+    try:
+        if staging_dir:
+            return file_path, read_staged(stage_source(file_path, staging_dir), SCHEMA.columns), None
+        return file_path, read_file(file_path), None
+    except ValueError as ve:
+        return file_path, None, ('skip', str(ve))
+    except Exception as e:
+        return file_path, None, ('error', str(e))
+
 class RealEstateETL:
+    def __init__(self, max_workers=None, force=False, progress=None, staging_dir=None):
+        self.max_workers = max_workers
+        self.staging_dir = staging_dir
+        self.progress = progress or (lambda phase, rows=None: None)
+        self.force = force
+        self.cleared = False
+        self.clear_pending = False
+        self.ingested = []
+        self.rejected = {}
+
+    def read_sources(self, paths):
+        workers = self.max_workers or min(len(paths), os.cpu_count() or 1)
+        if workers <= 1:
+            return [read_source(path, self.staging_dir) for path in paths]
+        # Jobs run this on a JobManager thread, and forking a process that
+        # has other threads can copy a lock another thread holds. Spawned
+        # workers start from a fresh interpreter instead.
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            return list(pool.map(read_source, paths, repeat(self.staging_dir)))
+
+    def iter_source(self, file_path, chunksize):
+        if self.staging_dir:
+            staged = stage_source(file_path, self.staging_dir, chunksize)
+            return iter_staged(staged, chunksize, SCHEMA.columns)
+        return iter_file(file_path, chunksize)
+
+    def source_years(self, file_path, chunksize):
+        """The sale years in ``file_path``, read ahead of loading it, dates only."""
+        if self.staging_dir:
+            staged = stage_source(file_path, self.staging_dir, chunksize)
+            chunks = iter_staged(staged, chunksize, DATE_SCHEMA.columns)
+        else:
+            chunks = get_reader(file_path, DATE_SCHEMA).iter_chunks(file_path, chunksize)
+        for chunk in chunks:
+            yield from convert_datetime(chunk)['prev_sold_date'].dt.year.dropna().unique()
+
     def extract_data(self):
         df_list=[]
-        for root, dirs, files in os.walk('data_sources'):
-            for file in files:
-                file_path = os.path.join(root, file)
-                try:
-                    df = read_file(file_path)
-                    df_list.append(df)
-                    print(f"Successfully read {file_path}")
-                except ValueError as ve:
-                    print(f"Skipping {file_path}: {ve}")
-                except Exception as e:
-                    print(f"Error reading {file_path}: {e}")
+        pending = {fp.path: fp for fp in pending_files(source_files(), self.force)}
+        for file_path, df, error in self.read_sources(list(pending)):
+            if error is None:
+                df_list.append(df)
+                self.ingested.append((pending[file_path], len(df)))
+                print(f"Successfully read {file_path}")
+            elif error[0] == 'skip':
+                print(f"Skipping {file_path}: {error[1]}")
+            else:
+                print(f"Error reading {file_path}: {error[1]}")
         
+        if not df_list:
+            logger.debug("no new or changed source files")
+            return pd.DataFrame()
         final_frame=pd.concat(df_list)
         logger.debug("extraction done")
         return final_frame
+
+    def run(self, streaming=False, chunksize=CHUNK_SIZE):
+        if streaming:
+            return self.run_streaming(chunksize)
+        self.progress('extract', 0)
+        data = self.extract_data()
+        logger.debug(f"Extracted {len(data)} records")
+        if data.empty:
+            logger.info("No new or changed source files")
+            return 0
+
+        self.progress('transform', len(data))
+        transformed_data = self.transformation(data)
+        logger.debug(f"Transformed {len(transformed_data)} records")
+        logger.info(f"Rows rejected per rule: {self.rejected}")
+
+        self.progress('load', len(transformed_data))
+        self.load_data(transformed_data)
+        return len(transformed_data)
+
+    def run_streaming(self, chunksize=CHUNK_SIZE):
+        """Extract, transform and load one chunk at a time to bound peak memory.
+
+        Each file loads in one transaction that ends with its manifest
+        entry, so a file that fails part way leaves nothing behind and is
+        loaded again in full by the next run.
+        """
+        total = 0
+        for fingerprint in pending_files(source_files(), self.force):
+            file_path = fingerprint.path
+            checkpoint = get_repository().checkpoint()
+            try:
+                get_repository().prepare_load(self.source_years(file_path, chunksize))
+                if self.force and not self.cleared:
+                    self.clear_data()
+                rows = loaded = 0
+                for chunk in self.iter_source(file_path, chunksize):
+                    rows += len(chunk)
+                    transformed = self.transformation(chunk)
+                    if len(transformed):
+                        self.write_frame(transformed)
+                    loaded += len(transformed)
+                    self.progress('load', total + loaded)
+                record_ingested(fingerprint, rows)
+                self.commit()
+                total += loaded
+                print(f"Successfully read {file_path}")
+            except ValueError as ve:
+                self.rollback(checkpoint)
+                print(f"Skipping {file_path}: {ve}")
+            except Exception as e:
+                self.rollback(checkpoint)
+                print(f"Error reading {file_path}: {e}")
+        logger.info(f"Rows rejected per rule: {self.rejected}")
+        logger.debug("streaming load done")
+        return total
+
+    def apply_rules(self, df):
+        df, rejected = TRANSFORM_RULES.filter(df)
+        for rule, count in rejected.items():
+            self.rejected[rule] = self.rejected.get(rule, 0) + count
+        return df
+
     def transformation(self,df):
-        df=df.dropna()
-        df=df[df['status']=='for_sale']
-        df = df[(df['bed'] >= 1) & (df['bed'] <= 10)]
-        df = df[(df['bath'] >= 1) & (df['bath'] <= 10)]
-        df=df[df['price']>0]
+        df=compact_dtypes(df)
+        df=self.apply_rules(df)
         df=convert_datetime(df)
-        df['day']=df['prev_sold_date'].dt.day
-        df['month']=df['prev_sold_date'].dt.month
-        df['year']=df['prev_sold_date'].dt.year
+        dates=df['prev_sold_date'].dt
+        df=df.assign(day=dates.day, month=dates.month, year=dates.year)
         logger.debug("transform done")
         return df 
     
 
-    def load_data(self,df):
-        logger.debug(df)
-        records = []
-        for _, row in df.iterrows():
-            record = RealEstateData(
-                price=row['price'],
-                bed=row['bed'],
-                bath=row['bath'],
-                state=row['state'],
-                house_size=row['house_size'],
-                day=row['day'],
-                month=row['month'],
-                year=row['year']
-            )
-            records.append(record)
-        
-        db.session.bulk_save_objects(records)
+    def clear_data(self):
+        repository = get_repository()
+        IngestedFile.query.delete()
+        if repository.transactional:
+            # A forced full reload replaces everything in the same
+            # transaction as the first batch it loads.
+            repository.clear()
+            self.cleared = self.clear_pending = True
+            return
+        # The store cannot roll back with the session, so the manifest
+        # reset commits first. If the reload fails, the next run then
+        # loads every file again instead of skipping them all.
+        db.session.commit()
+        repository.clear()
+        self.cleared = True
+
+    def commit(self):
         db.session.commit()
+        self.clear_pending = False
+        chart_cache.bump_version()
 
+    def rollback(self, checkpoint=None):
+        db.session.rollback()
+        if checkpoint is not None:
+            get_repository().discard_since(checkpoint)
+        if self.clear_pending:
+            # The clear was rolled back too; the next load does it again.
+            self.cleared = self.clear_pending = False
 
+    def write_frame(self, df):
+        """Add ``df``'s rows to the open transaction; the caller commits."""
+        if self.force and not self.cleared:
+            self.clear_data()
+        rows = get_repository().bulk_load(SCHEMA.to_model(df)[COLUMNS])
+        logger.debug(f"Loaded {rows} records")
+        return rows
+
+    def load_data(self,df):
+        logger.debug(df)
+        # Rows and manifest entries commit together or not at all.
+        get_repository().prepare_load(df['year'].dropna().unique())
+        checkpoint = get_repository().checkpoint()
+        try:
+            self.write_frame(df)
+            for fingerprint, count in self.ingested:
+                record_ingested(fingerprint, count)
+            self.commit()
+        except Exception:
+            self.rollback(checkpoint)
+            raise
+        self.ingested = []
@@ -0,0 +1,63 @@
+import io
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, DateTime, Float, Integer
+
+ARROW_TYPES = [
+    (Boolean, pa.bool_()),
+    (Integer, pa.int64()),
+    (Float, pa.float64()),
+    (DateTime, pa.timestamp('us')),
+]
+
+
+def arrow_schema(table):
+    # Typed from the table, not the first batch, whose columns may be all NULL.
+    fields = []
+    for column in table.columns:
+        arrow_type = next((t for sql_type, t in ARROW_TYPES if isinstance(column.type, sql_type)),
+                          pa.string())
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def csv_chunks(frames):
+    header = True
+    for frame in frames:
+        yield frame.to_csv(index=False, header=header)
+        header = False
+
+
+def parquet_chunks(frames, table):
+    """Encode ``frames`` as one Parquet file, yielding bytes after each row group."""
+    schema = arrow_schema(table)
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema)
+    for frame in frames:
+        writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
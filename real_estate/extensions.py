@@ -1,2 +1,12 @@
 from flask_sqlalchemy import SQLAlchemy
-db=SQLAlchemy()
\ No newline at end of file
+from backends import BackendRegistry, RoutingSession
+from chart_cache import ChartCache
+from jobs import JobManager
+from user_cache import UserCache
+from passwords import PasswordHasher
+db=SQLAlchemy(session_options={'class_': RoutingSession})
+backends=BackendRegistry()
+chart_cache=ChartCache()
+jobs=JobManager()
+user_cache=UserCache()
+password_hasher=PasswordHasher()
\ No newline at end of file
@@ -0,0 +1,96 @@
+import hashlib
+import operator
+import numpy as np
+from sqlalchemy import and_
+
+OPS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    'between': lambda series, bounds: series.between(*bounds),
+    'in': lambda series, values: series.isin(values),
+    'notna': lambda series, value: series.notna(),
+}
+# The same rules as SQL criteria; comparisons and between() carry over as is.
+SQL_OPS = dict(OPS, **{
+    'in': lambda column, values: column.in_(values),
+    'notna': lambda column, value: column.isnot(None),
+})
+
+
+class Rule:
+    """Keep rows where ``column <op> value`` holds; missing values never pass.
+
+    A ``notna`` rule without a column requires every column to be present,
+    like DataFrame.dropna().
+    """
+
+    def __init__(self, column, op, value=None, name=None):
+        if op not in OPS:
+            raise ValueError(f"unknown filter operator {op!r}")
+        if column is None and op != 'notna':
+            raise ValueError("only notna rules may span every column")
+        self.column = column
+        self.op = op
+        self.value = value
+        if name is None:
+            if column is None:
+                name = 'complete row'
+            elif op == 'notna':
+                name = f'{column} notna'
+            else:
+                name = f'{column} {op} {value!r}'
+        self.name = name
+
+    def evaluate(self, df):
+        if self.column is None:
+            result = df.notna().all(axis=1)
+        else:
+            series = df[self.column]
+            # NaN and None compare unequal to everything, so != alone would
+            # pass them, where SQL's criterion never matches NULL.
+            result = OPS[self.op](series, self.value) & series.notna()
+        return result.to_numpy(dtype=bool, na_value=False)
+
+    def criterion(self, model):
+        if self.column is None:
+            return and_(*(column.isnot(None) for column in model.__table__.columns))
+        return SQL_OPS[self.op](getattr(model, self.column), self.value)
+
+
+class RuleSet:
+    """An ordered list of rules evaluated into one boolean mask.
+
+    Each rule is computed over whole columns and folded into the mask, so
+    the frame itself is copied once, by the final selection. A row is
+    counted against the first rule that rejects it. The same rules can be
+    pushed down to SQL with criteria().
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+
+    def mask(self, df):
+        keep = np.ones(len(df), dtype=bool)
+        rejected = {}
+        for rule in self.rules:
+            passed = rule.evaluate(df)
+            rejected[rule.name] = int(np.count_nonzero(keep & ~passed))
+            keep &= passed
+        return keep, rejected
+
+    def filter(self, df):
+        keep, rejected = self.mask(df)
+        return df[keep], rejected
+
+    def criteria(self, model):
+        """The rules as SQLAlchemy WHERE criteria against ``model``."""
+        return [rule.criterion(model) for rule in self.rules]
+
+    def key(self):
+        """A short stable digest of the rules, for cache keys."""
+        spec = repr([(rule.column, rule.op, rule.value) for rule in self.rules])
+        return hashlib.sha1(spec.encode()).hexdigest()[:16]
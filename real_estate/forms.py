@@ -1,6 +1,7 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SelectField, SubmitField
-from wtforms.validators import DataRequired, Email, Length
+from wtforms import StringField, PasswordField, SelectField, SubmitField, IntegerField
+from wtforms.validators import DataRequired, Email, Length, Optional, NumberRange
+from filters import Rule, RuleSet
 
 class LoginForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired()])
@@ -18,4 +19,39 @@ class RegistrationForm(FlaskForm):
         ('validator', 'Data Validator'),
         ('viewer', 'Viewer')
     ])
-    submit = SubmitField('Register')
\ No newline at end of file
+    submit = SubmitField('Register')
+
+class DashboardFilterForm(FlaskForm):
+    # Read from the query string, so bookmarked drill-downs need no CSRF token.
+    class Meta:
+        csrf = False
+
+    state = SelectField('State', choices=[('', 'All states')], default='')
+    year_from = IntegerField('Sold from', validators=[Optional(), NumberRange(min=1800, max=2100)])
+    year_to = IntegerField('Sold to', validators=[Optional(), NumberRange(min=1800, max=2100)])
+    price_min = IntegerField('Min price', validators=[Optional(), NumberRange(min=0)])
+    price_max = IntegerField('Max price', validators=[Optional(), NumberRange(min=0)])
+    bed_min = IntegerField('Min beds', validators=[Optional(), NumberRange(min=0)])
+    bed_max = IntegerField('Max beds', validators=[Optional(), NumberRange(min=0)])
+    bath_min = IntegerField('Min baths', validators=[Optional(), NumberRange(min=0)])
+    bath_max = IntegerField('Max baths', validators=[Optional(), NumberRange(min=0)])
+    submit = SubmitField('Apply')
+
+    RANGES = [
+        ('year', 'year_from', 'year_to'),
+        ('price', 'price_min', 'price_max'),
+        ('bed', 'bed_min', 'bed_max'),
+        ('bath', 'bath_min', 'bath_max'),
+    ]
+
+    def rules(self):
+        """The filled-in filters as a RuleSet; an empty set charts everything."""
+        rules = []
+        if self.state.data:
+            rules.append(Rule('state', '==', self.state.data))
+        for column, low, high in self.RANGES:
+            if self[low].data is not None:
+                rules.append(Rule(column, '>=', self[low].data))
+            if self[high].data is not None:
+                rules.append(Rule(column, '<=', self[high].data))
+        return RuleSet(rules)
@@ -0,0 +1,114 @@
+from html.parser import HTMLParser
+import pandas as pd
+
+BLOCK_SIZE = 1 << 16
+# Spellings DataFrame.to_html and friends use for missing cells.
+NA_VALUES = {'', 'NaN', 'nan', 'None', '<NA>', 'NaT'}
+
+
+class TableParser(HTMLParser):
+    """Incrementally collects the rows of the first <table> fed to it.
+
+    Completed body rows accumulate in ``rows`` until the caller drains them,
+    so only the rows parsed since the last drain are ever held in memory.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.header = None
+        self.rows = []
+        self.done = False
+        self._depth = 0
+        self._in_head = False
+        self._row = None
+        self._row_is_header = False
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == 'table':
+            self._depth += 1
+        elif self._depth != 1:
+            return
+        elif tag == 'thead':
+            self._in_head = True
+        elif tag == 'tr':
+            self._row = []
+            self._row_is_header = True
+        elif tag in ('td', 'th') and self._row is not None:
+            self._cell = []
+            if tag == 'td':
+                self._row_is_header = False
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+        if tag == 'table':
+            self._depth -= 1
+            self.done = self._depth == 0
+        elif self._depth != 1:
+            return
+        elif tag in ('td', 'th') and self._cell is not None:
+            self._row.append(''.join(self._cell).strip())
+            self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            if self.header is None and (self._in_head or self._row_is_header):
+                self.header = self._row
+            elif self._row:
+                self.rows.append(self._row)
+            self._row = None
+        elif tag == 'thead':
+            self._in_head = False
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def drain(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+
+def _frame(header, rows, usecols=None):
+    frame = pd.DataFrame(rows, columns=header)
+    if usecols is not None:
+        # Project before converting; unused columns never cost a to_numeric.
+        frame = frame[[name for name in frame.columns if usecols(name)]]
+    frame = frame.mask(frame.isin(NA_VALUES))
+    for name in frame.columns:
+        try:
+            frame[name] = pd.to_numeric(frame[name])
+        except (ValueError, TypeError):
+            pass
+    return frame
+
+
+def iter_html_table(file_path, chunksize, block_size=BLOCK_SIZE, usecols=None):
+    """Yield the first table in an HTML file as frames of ``chunksize`` rows.
+
+    ``usecols`` is an optional predicate on column names, as for read_csv.
+    """
+    parser = TableParser()
+    pending = []
+    with open(file_path, encoding='utf-8') as f:
+        while not parser.done:
+            block = f.read(block_size)
+            if not block:
+                parser.close()
+            else:
+                parser.feed(block)
+            pending.extend(parser.drain())
+            while len(pending) >= chunksize:
+                yield _frame(parser.header, pending[:chunksize], usecols)
+                pending = pending[chunksize:]
+            if not block:
+                break
+    if parser.header is None:
+        raise ValueError("No table found")
+    if pending:
+        yield _frame(parser.header, pending, usecols)
+
+
+def read_html_table(file_path, chunksize=50000, usecols=None):
+    return pd.concat(iter_html_table(file_path, chunksize, usecols=usecols), ignore_index=True)
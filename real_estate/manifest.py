@@ -0,0 +1,54 @@
+import hashlib
+import os
+from datetime import datetime
+from extensions import db
+from models import IngestedFile
+
+
+class Fingerprint:
+    def __init__(self, path, size, mtime_ns, content_hash):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.content_hash = content_hash
+
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def pending_files(paths, force=False):
+    """Fingerprint the paths that are new or changed since their last ingest.
+
+    Size and mtime are compared first; only files whose stat changed are
+    hashed, and a file that was merely touched (same hash) is still skipped.
+    With ``force`` every path is returned.
+    """
+    known = {} if force else {entry.path: entry for entry in IngestedFile.query.all()}
+    pending = []
+    for path in paths:
+        stat = os.stat(path)
+        entry = known.get(path)
+        if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+            continue
+        content_hash = file_hash(path)
+        if entry is not None and entry.content_hash == content_hash:
+            continue
+        pending.append(Fingerprint(path, stat.st_size, stat.st_mtime_ns, content_hash))
+    return pending
+
+
+def record_ingested(fingerprint, rows):
+    entry = IngestedFile.query.filter_by(path=fingerprint.path).first()
+    if entry is None:
+        entry = IngestedFile(path=fingerprint.path)
+        db.session.add(entry)
+    entry.size = fingerprint.size
+    entry.mtime_ns = fingerprint.mtime_ns
+    entry.content_hash = fingerprint.content_hash
+    entry.rows = rows
+    entry.ingested_at = datetime.utcnow()
@@ -0,0 +1,83 @@
+"""Partition real_estate_data by sale year on PostgreSQL
+
+Revision ID: 9d5a6c3e2f71
+Revises: 4b7e9d2c1a6f
+Create Date: 2026-10-18 15:21:44.106583
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d5a6c3e2f71'
+down_revision = '4b7e9d2c1a6f'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_real_estate_data_state_price_size': ['state', 'price', 'house_size'],
+    'ix_real_estate_data_bed_price': ['bed', 'price'],
+    'ix_real_estate_data_bath_price': ['bath', 'price'],
+    'ix_real_estate_data_year_month_price': ['year', 'month', 'price'],
+    'ix_real_estate_data_month_price': ['month', 'price'],
+}
+COLUMNS = 'id, price, bed, bath, state, house_size, day, month, year'
+TABLE_BODY = """
+    id integer NOT NULL DEFAULT nextval('real_estate_data_id_seq'),
+    price double precision,
+    bed double precision,
+    bath double precision,
+    state varchar(50),
+    house_size double precision,
+    day integer,
+    month integer,
+    year integer {year_null},
+    {primary_key}
+"""
+
+
+def _swap_out(name):
+    # Index names are schema-wide on PostgreSQL, so the old table's go first.
+    for index in INDEXES:
+        op.drop_index(index, table_name='real_estate_data')
+    op.execute(f'ALTER TABLE real_estate_data RENAME TO {name}')
+    op.execute(f'ALTER TABLE {name} RENAME CONSTRAINT real_estate_data_pkey TO {name}_pkey')
+
+
+def _swap_in(name):
+    op.execute('ALTER SEQUENCE real_estate_data_id_seq OWNED BY real_estate_data.id')
+    op.execute(f'INSERT INTO real_estate_data ({COLUMNS}) SELECT {COLUMNS} FROM {name}')
+    op.execute(f'DROP TABLE {name}')
+    for index, columns in INDEXES.items():
+        op.create_index(index, 'real_estate_data', columns, unique=False)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        # SQLite and MySQL keep the plain table; year filters use the
+        # (year, month, price) index instead of partition pruning.
+        return
+    _swap_out('real_estate_data_unpartitioned')
+    # The partition key has to be part of the primary key. A NULL year
+    # fails the copy below and rolls the whole migration back.
+    op.execute('CREATE TABLE real_estate_data (' + TABLE_BODY.format(
+        year_null='NOT NULL', primary_key='PRIMARY KEY (id, year)') + ') PARTITION BY RANGE (year)')
+    years = bind.execute(sa.text(
+        'SELECT DISTINCT year FROM real_estate_data_unpartitioned WHERE year IS NOT NULL ORDER BY year')).scalars()
+    for year in years:
+        op.execute(f'CREATE TABLE real_estate_data_y{year} PARTITION OF real_estate_data '
+                   f'FOR VALUES FROM ({year}) TO ({year + 1})')
+    op.execute('CREATE TABLE real_estate_data_default PARTITION OF real_estate_data DEFAULT')
+    _swap_in('real_estate_data_unpartitioned')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    _swap_out('real_estate_data_partitioned')
+    op.execute('CREATE TABLE real_estate_data (' + TABLE_BODY.format(
+        year_null='', primary_key='PRIMARY KEY (id)') + ')')
+    _swap_in('real_estate_data_partitioned')
@@ -1,24 +1,47 @@
 
+from datetime import datetime
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
 
-from extensions import db
+from extensions import db, backends, user_cache, password_hasher
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128))
+    password_hash = db.Column(db.String(256))
     role = db.Column(db.String(20), nullable=False, default='viewer')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.check(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
+
+
+# Registration, role changes and deletes drop the cached identity, so the
+# next request reloads it.
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate((backends.current(object_session(target)), target.id))
 
 
 
 class RealEstateData(UserMixin, db.Model):
+    # Each index leads with a dashboard group/filter column and carries the
+    # measures its charts aggregate, so GROUP BY reads only the index.
+    __table_args__ = (
+        db.Index('ix_real_estate_data_state_price_size', 'state', 'price', 'house_size'),
+        db.Index('ix_real_estate_data_bed_price', 'bed', 'price'),
+        db.Index('ix_real_estate_data_bath_price', 'bath', 'price'),
+        db.Index('ix_real_estate_data_year_month_price', 'year', 'month', 'price'),
+        db.Index('ix_real_estate_data_month_price', 'month', 'price'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     price=db.Column(db.Float)
     bed=db.Column(db.Float)
@@ -28,3 +51,14 @@ class RealEstateData(UserMixin, db.Model):
     day=db.Column(db.Integer)
     month=db.Column(db.Integer)
     year=db.Column(db.Integer)
+
+
+class IngestedFile(db.Model):
+    __tablename__ = 'ingested_files'
+    id = db.Column(db.Integer, primary_key=True)
+    path = db.Column(db.String(255), unique=True, nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    mtime_ns = db.Column(db.BigInteger, nullable=False)
+    content_hash = db.Column(db.String(64), nullable=False)
+    rows = db.Column(db.Integer)
+    ingested_at = db.Column(db.DateTime, default=datetime.utcnow)
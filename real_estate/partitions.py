@@ -0,0 +1,59 @@
+from sqlalchemy import text
+from models import RealEstateData
+
+# On PostgreSQL migration 9d5a6c3e2f71 turns real_estate_data into a table
+# partitioned by RANGE (year), one partition per year plus a default. Other
+# dialects keep the plain table and rely on the (year, month, price) index
+# for the same WHERE clauses. Queries need nothing partition-specific: the
+# dashboard and API year filters become plain criteria on year (see
+# DashboardFilterForm.rules), which PostgreSQL prunes partitions by.
+TABLE = RealEstateData.__tablename__
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+def partition_name(year):
+    return f'{TABLE}_y{int(year)}'
+
+
+def is_partitioned(connection):
+    if connection.dialect.name != 'postgresql':
+        return False
+    return connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"), {'table': TABLE}).first() is not None
+
+
+def ensure_partitions(engine, years):
+    """Create any missing year partitions so a load never lands in the default one.
+
+    Rows for the year that are already in the default partition, loaded
+    before its partition existed, move into the new partition first;
+    PostgreSQL refuses to add a partition whose range the default holds.
+
+    Runs in a transaction of its own, committed before the load starts.
+    ATTACH PARTITION locks the default partition ACCESS EXCLUSIVE, and on
+    the load's transaction that lock would block dashboard reads until the
+    whole load commits. ``years`` is only read on a partitioned table.
+    """
+    if engine.dialect.name != 'postgresql':
+        return []
+    created = []
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            return []
+        has_default = connection.execute(
+            text("SELECT to_regclass(:name)"), {'name': DEFAULT_PARTITION}).scalar() is not None
+        for year in sorted({int(year) for year in years}):
+            name = partition_name(year)
+            exists = connection.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar()
+            if exists is None:
+                connection.execute(text(f'CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)'))
+                if has_default:
+                    connection.execute(text(
+                        f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} '
+                        f'WHERE year >= {year} AND year < {year + 1} RETURNING *) '
+                        f'INSERT INTO {name} SELECT * FROM moved'))
+                connection.execute(text(
+                    f'ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ({year}) TO ({year + 1})'))
+                created.append(name)
+    return created
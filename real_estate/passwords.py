@@ -0,0 +1,74 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+class HasherBusy(Exception):
+    pass
+
+
+def method_prefix(method):
+    """The method as werkzeug writes it into a hash, defaults filled in."""
+    return generate_password_hash('', method).split('$', 1)[0]
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a small bounded thread pool.
+
+    hashlib releases the GIL while it works, so at most ``workers`` cores
+    are ever busy hashing. At most ``max_pending`` calls may be queued or
+    running; beyond that, and for calls still waiting after ``timeout``
+    seconds, HasherBusy is raised, so a login storm costs a fast error
+    instead of every request thread in the worker.
+    """
+
+    def __init__(self, app=None):
+        self.method = DEFAULT_METHOD
+        self.prefix = DEFAULT_METHOD
+        self.timeout = 10
+        self._executor = None
+        self._slots = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+        self.prefix = method_prefix(self.method)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        workers = app.config.get('PASSWORD_HASH_WORKERS') or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password')
+        self._slots = threading.BoundedSemaphore(
+            app.config.get('PASSWORD_HASH_MAX_PENDING') or workers * 4)
+        app.extensions['password_hasher'] = self
+
+    def _run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy("Too many password checks in progress")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise HasherBusy("Password check timed out") from None
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def check(self, pwhash, password):
+        if not pwhash:
+            return False
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        return bool(pwhash) and pwhash.split('$', 1)[0] != self.prefix
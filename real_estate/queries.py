@@ -0,0 +1,55 @@
+import pandas as pd
+from sqlalchemy import func, select
+from extensions import db
+
+AGGREGATES = {
+    'avg': func.avg,
+    'sum': func.sum,
+    'count': func.count,
+    'min': func.min,
+    'max': func.max,
+}
+
+
+def group_by_statement(model, group_by, aggregates, by_value=False, where=()):
+    """Build ``SELECT group, AGG(col), ... FROM table WHERE ... GROUP BY group``.
+
+    ``aggregates`` is a list of (aggregate name, column name) pairs; each
+    result column is labelled ``<aggregate>_<column>``. ``where`` holds extra
+    criteria, such as RuleSet.criteria(). Rows come back ordered by the group
+    column, or by the first aggregate descending if ``by_value``.
+    """
+    group = getattr(model, group_by)
+    columns = [group]
+    for name, column in aggregates:
+        columns.append(AGGREGATES[name](getattr(model, column)).label(f'{name}_{column}'))
+    stmt = select(*columns).where(group.isnot(None), *where).group_by(group)
+    if by_value:
+        return stmt.order_by(columns[1].desc())
+    return stmt.order_by(group)
+
+
+def run_group_by(model, group_by, aggregates, by_value=False, where=()):
+    result = db.session.execute(group_by_statement(model, group_by, aggregates, by_value, where))
+    return pd.DataFrame(result.all(), columns=list(result.keys()))
+
+
+def iter_frames(model, batch_size, where=(), after_id=0, limit=None):
+    """Yield rows with ``id > after_id``, in id order, as frames of ``batch_size``.
+
+    Rows come from a server-side cursor and stop after ``limit``, if given.
+    Seeking past the last id seen costs the same on every page, unlike
+    OFFSET, which rescans every row before the page. Always yields at least
+    one frame, empty if no rows match, so callers can rely on the column
+    names.
+    """
+    stmt = select(model.__table__).where(model.id > after_id, *where).order_by(model.id).limit(limit)
+    result = db.session.execute(stmt, execution_options={'stream_results': True,
+                                                         'yield_per': batch_size})
+    columns = list(result.keys())
+    empty = True
+    for rows in result.partitions():
+        empty = False
+        yield pd.DataFrame(rows, columns=columns)
+    if empty:
+        yield pd.DataFrame(columns=columns)
@@ -0,0 +1,197 @@
+import json
+import os
+import pandas as pd
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+from html_reader import read_html_table, iter_html_table
+
+READERS = {}
+
+
+class SourceSchema:
+    """The source columns a dataset uses, their dtypes, and their model names.
+
+    ``dtypes`` doubles as the projection: readers drop every other column,
+    ideally before parsing it. ``rename`` maps source names to model names
+    and is applied by load_data, after transformation.
+    """
+
+    def __init__(self, dtypes, rename=None):
+        self.dtypes = dtypes
+        self.rename = rename or {}
+
+    @property
+    def columns(self):
+        return list(self.dtypes)
+
+    def to_model(self, df):
+        return df.rename(columns=self.rename)
+
+
+def register_reader(cls):
+    for extension in cls.extensions:
+        READERS[extension] = cls
+    return cls
+
+
+def get_reader(file_path, schema):
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in READERS:
+        raise ValueError("Unsupported file format")
+    return READERS[extension](schema)
+
+
+def apply_dtypes(df, dtypes):
+    """Give every column the same type no matter which format it came from."""
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        dtype = dtypes.get(name)
+        if dtype == 'datetime':
+            series = pd.to_datetime(series, errors='coerce')
+        elif dtype == 'category':
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype('string').astype('category')
+        elif dtype is not None:
+            series = pd.to_numeric(series, errors='coerce')
+            try:
+                series = series.astype(dtype)
+            except (TypeError, ValueError):
+                series = series.astype('float64')
+        elif series.dtype.kind in 'biuf':
+            series = series.astype('float64')
+        else:
+            series = series.astype('string')
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+class Reader:
+    """Reads one source format into frames holding only the schema's columns."""
+
+    extensions = ()
+
+    def __init__(self, schema):
+        self.schema = schema
+
+    def wanted(self, name):
+        return name in self.schema.dtypes
+
+    def parse_dtypes(self):
+        # Hints cheap and safe to apply while parsing; everything else is
+        # coerced by finish().
+        return {name: dtype for name, dtype in self.schema.dtypes.items() if dtype == 'category'}
+
+    def finish(self, df):
+        missing = [name for name in self.schema.columns if name not in df.columns]
+        if missing:
+            raise ValueError(f"missing columns {missing}")
+        return apply_dtypes(df[self.schema.columns], self.schema.dtypes)
+
+    def read(self, file_path):
+        raise NotImplementedError
+
+    def iter_chunks(self, file_path, chunksize):
+        df = self.read(file_path)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+
+
+@register_reader
+class CsvReader(Reader):
+    extensions = ('.csv',)
+
+    def read(self, file_path):
+        return self.finish(pd.read_csv(file_path, usecols=self.wanted, dtype=self.parse_dtypes()))
+
+    def iter_chunks(self, file_path, chunksize):
+        with pd.read_csv(file_path, usecols=self.wanted, dtype=self.parse_dtypes(),
+                         chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield self.finish(chunk)
+
+
+@register_reader
+class XlsReader(Reader):
+    extensions = ('.xls',)
+
+    def read(self, file_path):
+        return self.finish(pd.read_excel(file_path, usecols=self.wanted))
+
+
+@register_reader
+class XlsxReader(XlsReader):
+    extensions = ('.xlsx',)
+
+    def iter_chunks(self, file_path, chunksize):
+        # openpyxl's read-only mode streams rows instead of loading the sheet.
+        workbook = load_workbook(file_path, read_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            keep = [i for i, name in enumerate(header) if self.wanted(name)]
+            columns = [header[i] for i in keep]
+            batch = []
+            for row in rows:
+                batch.append([row[i] for i in keep])
+                if len(batch) == chunksize:
+                    yield self.finish(pd.DataFrame(batch, columns=columns))
+                    batch = []
+            if batch:
+                yield self.finish(pd.DataFrame(batch, columns=columns))
+        finally:
+            workbook.close()
+
+
+def is_json_lines(file_path):
+    with open(file_path) as f:
+        first_line = f.readline().strip()
+    try:
+        return isinstance(json.loads(first_line), dict)
+    except ValueError:
+        return False
+
+
+@register_reader
+class JsonReader(Reader):
+    extensions = ('.json',)
+
+    def read(self, file_path):
+        return self.finish(pd.read_json(file_path, lines=is_json_lines(file_path)))
+
+    def iter_chunks(self, file_path, chunksize):
+        if not is_json_lines(file_path):
+            yield from super().iter_chunks(file_path, chunksize)
+            return
+        with pd.read_json(file_path, lines=True, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield self.finish(chunk)
+
+
+@register_reader
+class ParquetReader(Reader):
+    extensions = ('.parquet',)
+
+    def columns(self, parquet):
+        return [name for name in parquet.schema_arrow.names if self.wanted(name)]
+
+    def read(self, file_path):
+        parquet = pq.ParquetFile(file_path)
+        return self.finish(parquet.read(columns=self.columns(parquet)).to_pandas())
+
+    def iter_chunks(self, file_path, chunksize):
+        parquet = pq.ParquetFile(file_path)
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=self.columns(parquet)):
+            yield self.finish(batch.to_pandas())
+
+
+@register_reader
+class HtmlReader(Reader):
+    extensions = ('.html', '.htm')
+
+    def read(self, file_path):
+        return self.finish(read_html_table(file_path, usecols=self.wanted))
+
+    def iter_chunks(self, file_path, chunksize):
+        for chunk in iter_html_table(file_path, chunksize, usecols=self.wanted):
+            yield self.finish(chunk)
@@ -0,0 +1,188 @@
+import pandas as pd
+from flask import current_app
+from extensions import db
+from models import RealEstateData
+from bulk_loader import bulk_insert, DEFAULT_BATCH_SIZE
+from partitions import ensure_partitions
+from queries import run_group_by, iter_frames
+from aggregations import grouped_aggregate
+from staging import iter_staged, staged_files
+
+COLUMNS = [column.name for column in RealEstateData.__table__.columns]
+# aggregate() statistics under their pandas names.
+PANDAS_STATS = {'avg': 'mean', 'sum': 'sum', 'count': 'count', 'min': 'min', 'max': 'max'}
+
+
+def records(frame):
+    """Frame rows as dicts of plain Python values, missing values as None."""
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+
+def metric_name(aggregate, column):
+    return f'{aggregate}_{column}'
+
+
+class Repository:
+    """Everything the dashboards, the API and the ETL need from a store.
+
+    Frames use RealEstateData's column names and ``filters`` is a RuleSet
+    or None. Each store answers with its own fastest mechanism, so one can
+    be swapped or benchmarked against another without touching callers.
+    """
+
+    # Whether writes join db.session's transaction, and so roll back with
+    # it. Writes to other stores are undone with discard_since().
+    transactional = True
+
+    def checkpoint(self):
+        """A marker for discard_since(); None for transactional stores."""
+        return None
+
+    def discard_since(self, checkpoint):
+        """Remove rows written after ``checkpoint`` was taken."""
+
+    def prepare_load(self, years):
+        """Get ready for rows in ``years``, before the load's transaction begins.
+
+        ``years`` may be a generator; stores that need no preparing never
+        read it.
+        """
+
+    def clear(self):
+        raise NotImplementedError
+
+    def bulk_load(self, frame):
+        """Append ``frame``'s rows; returns how many were written."""
+        raise NotImplementedError
+
+    def aggregate(self, group_by, metrics, filters=None, by_value=False):
+        """One row per non-null ``group_by`` value, ordered by it.
+
+        ``metrics`` is a list of (aggregate, column) pairs, each becoming a
+        ``<aggregate>_<column>`` column. With ``by_value`` rows are ordered
+        by the first metric, largest first.
+        """
+        raise NotImplementedError
+
+    def stream_rows(self, batch_size, filters=None, after_id=0, limit=None):
+        """Yield rows with ``id > after_id`` in id order, as frames of ``batch_size``.
+
+        Stops after ``limit`` rows if given. Always yields at least one
+        frame, so callers can rely on the column names.
+        """
+        raise NotImplementedError
+
+
+class SqlRepository(Repository):
+    """real_estate_data in the active SQL backend.
+
+    Loads use COPY on PostgreSQL, into per-year partitions prepare_load()
+    creates, and batched inserts elsewhere. Filters become WHERE criteria,
+    so year bounds prune partitions.
+    """
+
+    def clear(self):
+        RealEstateData.query.delete()
+
+    def prepare_load(self, years):
+        ensure_partitions(db.session.get_bind(), years)
+
+    def bulk_load(self, frame):
+        return bulk_insert(frame, RealEstateData.__table__,
+                           batch_size=current_app.config.get('BULK_LOAD_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+
+    def aggregate(self, group_by, metrics, filters=None, by_value=False):
+        where = filters.criteria(RealEstateData) if filters is not None else ()
+        return run_group_by(RealEstateData, group_by, metrics, by_value=by_value, where=where)
+
+    def stream_rows(self, batch_size, filters=None, after_id=0, limit=None):
+        where = filters.criteria(RealEstateData) if filters is not None else ()
+        return iter_frames(RealEstateData, batch_size, where=where, after_id=after_id, limit=limit)
+
+
+class StagingRepository(Repository):
+    """The Parquet staging area, read only, for DASHBOARD_SOURCE = 'staging'.
+
+    Serves the sources extraction staged, which ``transform`` turns into
+    model columns as the ETL would. Only extraction writes here, so clear()
+    and bulk_load() raise. Rows have no surrogate key, so ids are row
+    ordinals across the staged files in name order, stable until a source
+    is restaged.
+    """
+
+    def __init__(self, staging_dir, columns, transform, chunksize=DEFAULT_BATCH_SIZE):
+        self.staging_dir = staging_dir
+        self.columns = columns
+        self.transform = transform
+        self.chunksize = chunksize
+
+    def _chunks(self):
+        for path in staged_files(self.staging_dir):
+            yield from iter_staged(path, self.chunksize, self.columns)
+
+    def _frames(self, filters=None):
+        next_id = 1
+        for chunk in self._chunks():
+            # Numbered before transform drops rows, so ids stay stable.
+            chunk.index = pd.RangeIndex(next_id, next_id + len(chunk))
+            next_id += len(chunk)
+            frame = self.transform(chunk)
+            frame.insert(0, 'id', frame.index)
+            frame = frame[[name for name in COLUMNS if name in frame.columns]].reset_index(drop=True)
+            if filters is not None:
+                frame, _ = filters.filter(frame)
+            yield frame
+
+    def clear(self):
+        raise TypeError("The staging area is read only; restage it by running the ETL")
+
+    def bulk_load(self, frame):
+        raise TypeError("The staging area is read only; the ETL loads the SQL store")
+
+    def _all_rows(self, filters):
+        frames = list(self._frames(filters))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COLUMNS)
+
+    def aggregate(self, group_by, metrics, filters=None, by_value=False):
+        frame = self._all_rows(filters)
+        # One groupby covers every metric.
+        stats = tuple(dict.fromkeys(PANDAS_STATS[name] for name, _ in metrics))
+        tables = grouped_aggregate(frame, [(group_by, column) for _, column in metrics],
+                                   stats=stats, quantiles=())
+        result = pd.DataFrame({group_by: tables[(group_by, metrics[0][1])].index})
+        for name, column in metrics:
+            result[metric_name(name, column)] = tables[(group_by, column)][PANDAS_STATS[name]].values
+        if by_value:
+            return result.sort_values(result.columns[1], ascending=False).reset_index(drop=True)
+        return result.sort_values(group_by).reset_index(drop=True)
+
+    def stream_rows(self, batch_size, filters=None, after_id=0, limit=None):
+        # Staging has no index on id, so earlier rows are read and skipped.
+        # Only one staged chunk and one batch are held at a time.
+        batch, buffered, sent = [], 0, 0
+        for frame in self._frames(filters):
+            frame = frame[frame['id'] > after_id]
+            if limit:
+                frame = frame.iloc[:limit - sent - buffered]
+            while len(frame):
+                part, frame = frame.iloc[:batch_size - buffered], frame.iloc[batch_size - buffered:]
+                batch.append(part)
+                buffered += len(part)
+                if buffered == batch_size:
+                    yield pd.concat(batch, ignore_index=True)
+                    batch, buffered, sent = [], 0, sent + buffered
+            if limit and sent + buffered >= limit:
+                break
+        if batch or not sent:
+            yield pd.concat(batch, ignore_index=True) if batch else pd.DataFrame(columns=COLUMNS)
+
+
+def get_repository():
+    """The app's repository, built on first use.
+
+    Tests can put their own in ``app.extensions['repository']``.
+    """
+    repository = current_app.extensions.get('repository')
+    if repository is None:
+        repository = current_app.extensions['repository'] = SqlRepository()
+    return repository
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Bump whenever a reader or the staged layout changes, so files staged by
+# older code are rebuilt instead of read.
+STAGING_FORMAT = 2
+
+
+def staged_path(file_path, staging_dir):
+    # Keyed on the whole path, so same-named sources in different
+    # directories never share a staged file.
+    digest = hashlib.sha1(os.path.normpath(file_path).encode()).hexdigest()[:12]
+    return os.path.join(staging_dir, f'{os.path.basename(file_path)}-{digest}.parquet')
+
+
+def _source_stamp(file_path, dtypes):
+    stat = os.stat(file_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+            'format': STAGING_FORMAT, 'dtypes': dtypes}
+
+
+def _staged_stamp(path):
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return json.loads(metadata.get(b'staging_source', b'null'))
+
+
+def is_fresh(file_path, staging_dir, dtypes):
+    """Whether the staged file matches the source's stat, the dtypes and STAGING_FORMAT."""
+    return _staged_stamp(staged_path(file_path, staging_dir)) == _source_stamp(file_path, dtypes)
+
+
+def staged_files(staging_dir):
+    """Paths of the staged files written in the current STAGING_FORMAT, in name order."""
+    if not os.path.isdir(staging_dir):
+        return []
+    paths = sorted(os.path.join(staging_dir, name) for name in os.listdir(staging_dir)
+                   if name.endswith('.parquet'))
+    return [path for path in paths if (_staged_stamp(path) or {}).get('format') == STAGING_FORMAT]
+
+
+def _stable_schema(schema, file_path, dtypes):
+    # Category codes may need int8 in one chunk and int16 in the next, so
+    # pin every dictionary column to int32 indices before the first write.
+    fields = [pa.field(field.name, pa.dictionary(pa.int32(), pa.string()))
+              if pa.types.is_dictionary(field.type) else field
+              for field in schema]
+    metadata = dict(schema.metadata or {})
+    metadata[b'staging_source'] = json.dumps(_source_stamp(file_path, dtypes)).encode()
+    return pa.schema(fields, metadata=metadata)
+
+
+def stage_file(file_path, staging_dir, chunks, dtypes):
+    """Write ``chunks`` (frames read from ``file_path``) to its Parquet staging file.
+
+    The chunks must already carry ``dtypes``, as reader output does; the
+    dtypes are stamped into the file so a schema change restages it.
+    """
+    os.makedirs(staging_dir, exist_ok=True)
+    path = staged_path(file_path, staging_dir)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = _stable_schema(table.schema, file_path, dtypes)
+                writer = pq.ParquetWriter(tmp_path, schema)
+            writer.write_table(table.cast(schema))
+    except Exception:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp_path)
+        raise
+    if writer is None:
+        raise ValueError("No rows to stage")
+    writer.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+def _project(names, columns):
+    if columns is None:
+        return None
+    return [name for name in columns if name in names]
+
+
+def read_staged(path, columns=None):
+    return pd.read_parquet(path, columns=_project(pq.read_schema(path).names, columns))
+
+
+def iter_staged(path, chunksize, columns=None):
+    parquet = pq.ParquetFile(path)
+    columns = _project(parquet.schema_arrow.names, columns)
+    for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
@@ -0,0 +1,117 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db, backends, chart_cache, user_cache  # noqa: E402
+
+LISTINGS = [
+    # status, price, bed, bath, state, house_size, prev_sold_date
+    ('for_sale', 105000.0, 3, 2, 'Puerto Rico', 920.0, '2012-06-14'),
+    ('for_sale', 80000.0, 4, 2, 'Puerto Rico', 1527.0, '2009-11-03'),
+    ('for_sale', 67000.0, 2, 1, 'Puerto Rico', 748.0, '2012-02-20'),
+    ('for_sale', 145000.0, 4, 2, 'Virgin Islands', 1800.0, '2018-07-01'),
+    ('for_sale', 179000.0, 4, 3, 'Virgin Islands', 2520.0, '2009-03-15'),
+    ('for_sale', 50000.0, 3, 1, 'Massachusetts', 2040.0, '2018-12-24'),
+    ('for_sale', 71600.0, 3, 2, 'Massachusetts', 1050.0, '2012-09-09'),
+    ('for_sale', 89000.0, 4, 2, 'New York', 1092.0, '2009-08-30'),
+    ('for_sale', 250000.0, 3, 3, 'New York', 5000.0, '2018-05-05'),
+    ('for_sale', 180000.0, 5, 4, 'Massachusetts', 2200.0, '2012-01-12'),
+    ('sold', 120000.0, 3, 2, 'New York', 1400.0, '2012-04-04'),
+    ('for_sale', 99000.0, 12, 2, 'New York', 1600.0, '2009-10-10'),
+]
+SOURCE_COLUMNS = ['status', 'price', 'bed', 'bath', 'state', 'house_size', 'prev_sold_date']
+# Listings that pass the ETL's rules: for sale, with 1-10 beds and baths.
+VALID_LISTINGS = 10
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config.from_object('config.Config')
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'real_estate.db'}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        DATABASE_BACKEND='sqlite',
+        DATABASE_BACKENDS={},
+        BULK_LOAD_BATCH_SIZE=3,
+        STAGING_DIR=str(tmp_path / 'staging'),
+    )
+    db.init_app(app)
+    backends.init_app(app, db)
+    chart_cache.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    """Two CSV sources under data_sources/, six listings each."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('data_sources')
+    frame = pd.DataFrame(LISTINGS, columns=SOURCE_COLUMNS)
+    paths = []
+    for number, part in enumerate((frame.iloc[:6], frame.iloc[6:]), start=1):
+        path = os.path.join('data_sources', f'part{number}.csv')
+        part.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture(scope='session')
+def web_app(tmp_path_factory):
+    """The app module, imported once with SQLiteConfig pointed at a temp dir."""
+    import config
+    tmp_path = tmp_path_factory.mktemp('web')
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('APP_CONFIG', 'config.SQLiteConfig')
+        for name, value in {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'real_estate.db'}",
+            'DATABASE_BACKENDS': {},
+            'STAGING_DIR': str(tmp_path / 'staging'),
+            'WTF_CSRF_ENABLED': False,
+        }.items():
+            patch.setattr(config.SQLiteConfig, name, value, raising=False)
+        # The app opens its log files in the working directory.
+        patch.chdir(tmp_path)
+        import app as web_app
+    return web_app
+
+
+@pytest.fixture
+def client(web_app):
+    """A test client for the real app, on empty tables."""
+    app = web_app.app
+    # Each ``app`` fixture registers its own engine; take the registry back.
+    backends.init_app(app, db)
+    user_cache.clear()
+    chart_cache.clear()
+    with app.app_context():
+        db.create_all()
+    yield app.test_client()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def login(client):
+    """Log the client in as a new user with the given role."""
+    from models import User
+
+    def login(role):
+        with client.application.app_context():
+            user = User(username=role, email=f'{role}@example.com', role=role)
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+    return login
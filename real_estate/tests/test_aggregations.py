@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from aggregations import grouped_aggregate
+
+FRAME = pd.DataFrame({
+    'state': pd.Categorical(['New York', 'Maine', 'New York', 'Maine', 'Ohio', 'New York']),
+    'bed': [3, 2, 3, 4, 2, 5],
+    'price': [250000.0, 89000.0, 120000.0, np.nan, 75000.0, 310000.0],
+    'house_size': [1400.0, 900.0, 1100.0, 2000.0, 1500.0, 2600.0],
+})
+PAIRS = [('state', 'price'), ('state', 'house_size'), ('bed', 'price')]
+
+
+def expected(group_col, value_col):
+    """The per-group statistics computed one group at a time."""
+    rows = {}
+    for group in sorted(FRAME[group_col].unique()):
+        values = FRAME.loc[FRAME[group_col] == group, value_col].dropna()
+        rows[group] = {'count': len(values), 'sum': values.sum(), 'mean': values.mean(),
+                       'min': values.min(), 'max': values.max(), 'q50': values.median()}
+    return rows
+
+
+@pytest.mark.parametrize('pair', PAIRS)
+def test_matches_group_by_group(pair):
+    table = grouped_aggregate(FRAME, PAIRS)[pair]
+    for group, stats in expected(*pair).items():
+        for stat, value in stats.items():
+            assert table.loc[group, stat] == pytest.approx(value, nan_ok=True)
+
+
+def test_shared_group_column_keeps_each_value_column():
+    tables = grouped_aggregate(FRAME, PAIRS, quantiles=())
+    assert set(tables) == set(PAIRS)
+    assert list(tables[('state', 'price')].columns) == ['count', 'sum', 'mean', 'min', 'max']
+    assert tables[('state', 'house_size')].loc['Maine', 'sum'] == 2900.0
+
+
+def test_quantiles_only():
+    table = grouped_aggregate(FRAME, [('bed', 'price')], stats=(), quantiles=(0.25, 0.75))[('bed', 'price')]
+    assert list(table.columns) == ['q25', 'q75']
+    assert table.loc[3, 'q25'] == pytest.approx(152500.0)
@@ -0,0 +1,53 @@
+import io
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from etl import RealEstateETL
+from conftest import VALID_LISTINGS
+
+
+@pytest.fixture
+def loaded(client, login, sources):
+    with client.application.app_context():
+        RealEstateETL(max_workers=1).run()
+    login('viewer')
+    return client
+
+
+def test_rows_pages_cover_everything(loaded):
+    ids, after_id, pages = [], 0, 0
+    while after_id is not None:
+        page = loaded.get(f'/api/rows?limit=3&after_id={after_id}').get_json()
+        assert len(page['rows']) <= 3
+        ids += [row['id'] for row in page['rows']]
+        after_id, pages = page['next_after_id'], pages + 1
+    assert ids == list(range(1, VALID_LISTINGS + 1))
+    assert pages == VALID_LISTINGS // 3 + 1
+
+
+def test_rows_limit_clamped(loaded):
+    assert len(loaded.get('/api/rows?limit=0').get_json()['rows']) == 1
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+def test_export(loaded, fmt):
+    response = loaded.get(f'/api/export.{fmt}')
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'].endswith(f'.{fmt}')
+    data = io.BytesIO(response.get_data())
+    frame = pd.read_csv(data) if fmt == 'csv' else pq.read_table(data).to_pandas()
+    assert frame['id'].tolist() == list(range(1, VALID_LISTINGS + 1))
+
+
+def test_unknown_export_format(loaded):
+    assert loaded.get('/api/export.xml').status_code == 404
+
+
+def test_api_needs_login(client):
+    assert client.get('/api/rows').status_code == 302
+
+
+def test_rows_filtered(loaded):
+    rows = loaded.get('/api/rows?state=New+York&year_from=2010').get_json()['rows']
+    assert rows and all(row['state'] == 'New York' and row['year'] >= 2010 for row in rows)
+    assert loaded.get('/api/rows?year_from=1200').status_code == 400
@@ -0,0 +1,53 @@
+import threading
+import time
+import pytest
+
+JSON = {'Accept': 'application/json'}
+
+
+@pytest.fixture
+def held_etl(web_app, monkeypatch):
+    """Replace the ETL with a job that runs until the test ends."""
+    release, started = threading.Event(), []
+
+    def run_etl(job, force):
+        started.append(job)
+        release.wait(5)
+    monkeypatch.setattr(web_app, 'run_etl', run_etl)
+    yield started
+    release.set()
+    deadline = time.time() + 5
+    while any(not job.finished for job in started) and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_etl_is_post_only(client, login):
+    login('admin')
+    assert client.get('/etl?full=1').status_code == 405
+
+
+def test_etl_requires_login(client, held_etl):
+    response = client.post('/etl', data={'full': '1'})
+    assert response.status_code == 302
+    assert '/login' in response.location
+    assert client.get('/etl/status/unknown').status_code == 302
+    assert held_etl == []
+
+
+def test_etl_requires_admin(client, login, held_etl):
+    login('viewer')
+    assert client.post('/etl', data={'full': '1'}, headers=JSON).status_code == 403
+    assert client.get('/etl/status/unknown').status_code == 403
+    assert held_etl == []
+
+
+def test_etl_conflicts_while_running(client, login, held_etl):
+    login('admin')
+    first = client.post('/etl', headers=JSON)
+    assert first.status_code == 202
+    job_id = first.get_json()['job_id']
+    second = client.post('/etl', headers=JSON)
+    assert second.status_code == 409
+    assert second.get_json()['job_id'] == job_id
+    assert client.get(f'/etl/status/{job_id}').get_json()['job_id'] == job_id
+    assert client.get('/etl/status/unknown').status_code == 404
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from bulk_loader import bulk_insert, coerce_to_table
+from extensions import db
+from models import RealEstateData
+
+TABLE = RealEstateData.__table__
+FRAME = pd.DataFrame({
+    'price': [105000.0, np.nan, 67000.0, 145000.0, 179000.0],
+    'bed': [3, 4, 2, 4, 4],
+    'state': ['Puerto Rico', 'Puerto Rico', None, 'New York', 'New York'],
+    'year': [2012.0, 2009.0, np.nan, 2018.0, 2009.0],
+})
+
+
+def test_coerce_to_table():
+    coerced = coerce_to_table(FRAME, TABLE)
+    assert str(coerced['bed'].dtype) == 'Float64'
+    assert str(coerced['year'].dtype) == 'Int64'
+    assert coerced['year'].isna().tolist() == [False, False, True, False, False]
+    assert FRAME['year'].dtype == np.float64
+
+
+def test_bulk_insert_in_batches(app):
+    assert bulk_insert(FRAME, TABLE, batch_size=2) == len(FRAME)
+    stored = db.session.query(RealEstateData.price, RealEstateData.bed, RealEstateData.state,
+                              RealEstateData.year).order_by(RealEstateData.id).all()
+    assert [tuple(row) for row in stored] == [
+        (105000.0, 3.0, 'Puerto Rico', 2012),
+        (None, 4.0, 'Puerto Rico', 2009),
+        (67000.0, 2.0, None, None),
+        (145000.0, 4.0, 'New York', 2018),
+        (179000.0, 4.0, 'New York', 2009),
+    ]
+
+
+def test_bulk_insert_leaves_commit_to_caller(app):
+    bulk_insert(FRAME, TABLE)
+    db.session.rollback()
+    assert db.session.query(RealEstateData).count() == 0
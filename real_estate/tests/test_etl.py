@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+from etl import RealEstateETL, compact_dtypes
+from repository import SqlRepository
+from conftest import VALID_LISTINGS
+
+
+class RecordingRepository(SqlRepository):
+    """SqlRepository that logs when partitions are prepared and rows loaded."""
+
+    def __init__(self):
+        self.calls = []
+
+    def prepare_load(self, years):
+        self.calls.append(('prepare', {int(year) for year in years}))
+        super().prepare_load(years)
+
+    def bulk_load(self, frame):
+        self.calls.append(('load', {int(year) for year in frame['year']}))
+        return super().bulk_load(frame)
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_partitions_prepared_before_each_load(app, sources, streaming):
+    repository = app.extensions['repository'] = RecordingRepository()
+    assert RealEstateETL(max_workers=1).run(streaming=streaming, chunksize=4) == VALID_LISTINGS
+    assert repository.calls[0][0] == 'prepare'
+    prepared = set()
+    for call, years in repository.calls:
+        if call == 'prepare':
+            prepared = years
+        else:
+            assert years <= prepared
+
+
+def test_parallel_extract_matches_serial(app, sources):
+    serial = RealEstateETL(max_workers=1).extract_data()
+    parallel = RealEstateETL(max_workers=2).extract_data()
+    assert parallel.reset_index(drop=True).equals(serial.reset_index(drop=True))
+
+
+def loaded_rows():
+    frame = pd.concat(SqlRepository().stream_rows(100), ignore_index=True)
+    return frame.drop(columns='id').sort_values(list(frame.columns[1:])).values.tolist()
+
+
+@pytest.mark.parametrize('chunksize', [1, 4, 100])
+def test_streaming_matches_batch(app, sources, chunksize):
+    assert RealEstateETL(max_workers=1).run() == VALID_LISTINGS
+    batch = loaded_rows()
+    assert RealEstateETL(max_workers=1, force=True).run(streaming=True, chunksize=chunksize) == VALID_LISTINGS
+    assert loaded_rows() == batch
+
+
+def test_compact_dtypes():
+    frame = pd.DataFrame({
+        'whole': [1.0, 2.0, None, 4.0],
+        'fraction': [1.5, 2.0, 3.0, 4.0],
+        'small': [1, 2, 3, 4],
+        'repeated': ['Low', 'High', 'Low', 'Low'],
+        'unique': ['a', 'b', 'c', 'd'],
+    })
+    compact = compact_dtypes(frame)
+    assert str(compact['whole'].dtype) == 'Int8'
+    assert compact['whole'].isna().tolist() == [False, False, True, False]
+    assert compact['fraction'].dtype == 'float64'
+    assert compact['small'].dtype == 'int8'
+    assert isinstance(compact['repeated'].dtype, pd.CategoricalDtype)
+    assert not isinstance(compact['unique'].dtype, pd.CategoricalDtype)
+    assert compact.astype(object).where(compact.notna(), None).values.tolist() == \
+        frame.astype(object).where(frame.notna(), None).values.tolist()
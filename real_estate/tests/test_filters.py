@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from flask import request
+from etl import RealEstateETL
+from filters import Rule, RuleSet
+from forms import DashboardFilterForm
+from models import RealEstateData
+from repository import SqlRepository
+
+FRAME = pd.DataFrame({
+    'state': ['New York', 'Ohio', None, 'Ohio'],
+    'price': [100.0, 250.0, 300.0, np.nan],
+    'bed': [2, 3, 4, 5],
+})
+
+
+def test_rules_count_first_rejection():
+    rules = RuleSet([Rule('state', '==', 'Ohio'), Rule('price', '>', 200)])
+    kept, rejected = rules.filter(FRAME)
+    assert kept['bed'].tolist() == [3]
+    # Row 3 fails on state (missing), row 4 on price (missing), not twice.
+    assert rejected == {"state == 'Ohio'": 2, 'price > 200': 1}
+
+
+@pytest.mark.parametrize('rule, beds', [
+    (Rule(None, 'notna'), [2, 3]),
+    (Rule('state', '!=', 'Ohio'), [2]),
+    (Rule('bed', 'between', (3, 4)), [3, 4]),
+    (Rule('state', 'in', ['Ohio', 'Texas']), [3, 5]),
+])
+def test_rule_operators(rule, beds):
+    assert RuleSet([rule]).filter(FRAME)[0]['bed'].tolist() == beds
+
+
+def test_bad_rules_rejected():
+    with pytest.raises(ValueError):
+        Rule('price', '~', 1)
+    with pytest.raises(ValueError):
+        Rule(None, '>', 1)
+
+
+def test_key_follows_rules():
+    rules = RuleSet([Rule('state', '==', 'Ohio')])
+    assert rules.key() == RuleSet([Rule('state', '==', 'Ohio')]).key()
+    assert rules.key() != RuleSet([Rule('state', '==', 'Texas')]).key()
+
+
+@pytest.mark.parametrize('rules', [
+    RuleSet([]),
+    RuleSet([Rule('state', 'in', ['New York', 'Massachusetts']), Rule('year', 'between', (2010, 2015))]),
+    RuleSet([Rule('price', '!=', 105000.0), Rule('bed', '>=', 4)]),
+])
+def test_sql_criteria_match_pandas(app, sources, rules):
+    RealEstateETL(max_workers=1).run()
+    every = pd.concat(SqlRepository().stream_rows(100), ignore_index=True)
+    expected = rules.filter(every)[0]['id'].tolist()
+    selected = RealEstateData.query.filter(*rules.criteria(RealEstateData)).order_by(RealEstateData.id)
+    assert [row.id for row in selected] == expected
+
+
+def test_form_rules(app):
+    query = '/?state=Ohio&year_from=2012&year_to=2018&price_max=200000'
+    with app.test_request_context(query):
+        form = DashboardFilterForm(formdata=request.args)
+        form.state.choices = [('', 'All states'), ('Ohio', 'Ohio')]
+        assert form.validate()
+        assert [(rule.column, rule.op, rule.value) for rule in form.rules().rules] == [
+            ('state', '==', 'Ohio'), ('year', '>=', 2012), ('year', '<=', 2018), ('price', '<=', 200000)]
+    with app.test_request_context('/?year_from=1200'):
+        form = DashboardFilterForm(formdata=request.args)
+        assert not form.validate()
+        assert 'year_from' in form.errors
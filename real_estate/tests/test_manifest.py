@@ -0,0 +1,53 @@
+import os
+import etl
+from etl import RealEstateETL
+from extensions import db
+from manifest import pending_files, record_ingested
+from models import IngestedFile
+from conftest import VALID_LISTINGS
+
+
+def record_all(paths):
+    for fingerprint in pending_files(paths):
+        record_ingested(fingerprint, 6)
+    db.session.commit()
+
+
+def test_new_files_pending(app, sources):
+    assert [fingerprint.path for fingerprint in pending_files(sources)] == sources
+    record_all(sources)
+    assert pending_files(sources) == []
+    assert {entry.path: entry.rows for entry in IngestedFile.query.all()} == dict.fromkeys(sources, 6)
+
+
+def test_touched_file_skipped(app, sources):
+    record_all(sources)
+    stat = os.stat(sources[0])
+    os.utime(sources[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert pending_files(sources) == []
+
+
+def test_changed_file_pending(app, sources):
+    record_all(sources)
+    with open(sources[1], 'a') as f:
+        f.write('for_sale,99000.0,3,2,Ohio,1200.0,2015-05-05\n')
+    assert [fingerprint.path for fingerprint in pending_files(sources)] == [sources[1]]
+    record_all(sources)
+    assert pending_files(sources) == []
+
+
+def test_force_returns_everything(app, sources):
+    record_all(sources)
+    assert [fingerprint.path for fingerprint in pending_files(sources, force=True)] == sources
+
+
+def test_etl_reads_only_changed_files(app, sources, monkeypatch):
+    assert RealEstateETL(max_workers=1).run() == VALID_LISTINGS
+    with open(sources[0], 'a') as f:
+        f.write('for_sale,99000.0,3,2,Ohio,1200.0,2015-05-05\n')
+    read = []
+    read_source = etl.read_source
+    monkeypatch.setattr(etl, 'read_source', lambda path, *args: read.append(path) or read_source(path, *args))
+    assert RealEstateETL(max_workers=1).run() == 7
+    assert read == [sources[0]]
+    assert IngestedFile.query.filter_by(path=sources[0]).one().rows == 7
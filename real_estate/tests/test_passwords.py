@@ -0,0 +1,78 @@
+import threading
+import pytest
+from flask import Flask
+from werkzeug.security import generate_password_hash
+from extensions import db, password_hasher
+from models import User
+from passwords import HasherBusy, PasswordHasher
+
+CHEAP = 'pbkdf2:sha256:1000'
+
+
+def hasher(**config):
+    app = Flask(__name__)
+    app.config.update(PASSWORD_HASH_METHOD=CHEAP, **config)
+    return PasswordHasher(app)
+
+
+def test_hash_and_check():
+    passwords = hasher()
+    pwhash = passwords.hash('secret')
+    assert passwords.check(pwhash, 'secret')
+    assert not passwords.check(pwhash, 'wrong')
+    assert not passwords.check(None, 'secret')
+    assert not passwords.needs_rehash(pwhash)
+    assert passwords.needs_rehash(generate_password_hash('secret', 'pbkdf2:sha256:2000'))
+
+
+def test_queue_is_bounded():
+    passwords = hasher(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_PENDING=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 'done'
+
+    worker = threading.Thread(target=passwords._run, args=(slow,))
+    worker.start()
+    started.wait(5)
+    with pytest.raises(HasherBusy):
+        passwords.hash('secret')
+    release.set()
+    worker.join(5)
+    assert passwords.check(passwords.hash('secret'), 'secret')
+
+
+def test_timeout_frees_the_caller():
+    passwords = hasher(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_TIMEOUT=0.05)
+    release = threading.Event()
+    with pytest.raises(HasherBusy):
+        passwords._run(release.wait, 5)
+    release.set()
+
+
+def add_user(client, pwhash):
+    with client.application.app_context():
+        db.session.add(User(username='alice', email='alice@example.com', role='viewer',
+                            password_hash=pwhash))
+        db.session.commit()
+
+
+def test_login_rehashes_old_method(client):
+    add_user(client, generate_password_hash('secret', CHEAP))
+    response = client.post('/login', data={'username': 'alice', 'password': 'secret'})
+    assert response.status_code == 302
+    with client.application.app_context():
+        user = User.query.filter_by(username='alice').one()
+        assert not password_hasher.needs_rehash(user.password_hash)
+        assert password_hasher.check(user.password_hash, 'secret')
+
+
+def test_login_busy_is_503(client, monkeypatch):
+    add_user(client, generate_password_hash('secret', CHEAP))
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(password_hasher, '_slots', slots)
+    response = client.post('/login', data={'username': 'alice', 'password': 'secret'})
+    assert response.status_code == 503
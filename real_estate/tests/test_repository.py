@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+import charts
+from etl import RealEstateETL, SCHEMA
+from filters import Rule, RuleSet
+from repository import SqlRepository, StagingRepository
+from conftest import VALID_LISTINGS
+
+FILTERS = RuleSet([Rule('year', '>=', 2012), Rule('price', '<=', 200000)])
+METRICS = [('avg', 'price'), ('count', 'id'), ('sum', 'house_size')]
+
+
+def rows(frame):
+    """Frame rows as plain values, floats rounded, for comparing stores."""
+    return [[round(float(value), 9) if isinstance(value, (int, float)) else value for value in row]
+            for row in frame.astype(object).values.tolist()]
+
+
+def staging_repository(app):
+    return StagingRepository(app.config['STAGING_DIR'], SCHEMA.columns, charts.staged_rows)
+
+
+@pytest.fixture
+def loaded(app, sources):
+    """Every listing in SQL and in the staging area, which serves it."""
+    RealEstateETL(max_workers=1, staging_dir=app.config['STAGING_DIR']).run()
+    return staging_repository(app)
+
+
+@pytest.mark.parametrize('group_by', ['state', 'bed', 'month'])
+@pytest.mark.parametrize('filters', [None, FILTERS])
+def test_aggregate_matches_sql(loaded, group_by, filters):
+    sql = SqlRepository().aggregate(group_by, METRICS, filters)
+    staged = loaded.aggregate(group_by, METRICS, filters)
+    assert list(staged.columns) == list(sql.columns)
+    assert rows(staged) == rows(sql)
+
+
+def test_aggregate_by_value(loaded):
+    sql = SqlRepository().aggregate('state', [('count', 'id')], by_value=True)
+    assert rows(loaded.aggregate('state', [('count', 'id')], by_value=True)) == rows(sql)
+
+
+@pytest.mark.parametrize('limit', [None, 4])
+def test_stream_rows_pages_match_sql(loaded, limit):
+    sql = list(SqlRepository().stream_rows(3, FILTERS, limit=limit))
+    pages = list(loaded.stream_rows(3, FILTERS, limit=limit))
+    assert [len(page) for page in pages] == [len(page) for page in sql]
+    # Staged ids count rejected rows too, so only the values are compared.
+    assert rows(pd.concat(pages).drop(columns='id')) == rows(pd.concat(sql).drop(columns='id'))
+    assert list(pages[0].columns) == list(sql[0].columns)
+
+
+@pytest.mark.parametrize('after', [2, 100])
+def test_stream_rows_resumes_after_id(loaded, after):
+    every = pd.concat(loaded.stream_rows(100), ignore_index=True)
+    after_id = every['id'].iloc[min(after, len(every)) - 1]
+    rest = pd.concat(loaded.stream_rows(3, after_id=after_id), ignore_index=True)
+    assert rows(rest) == rows(every[every['id'] > after_id])
+
+
+def test_staging_is_read_only(loaded):
+    frame = pd.concat(SqlRepository().stream_rows(100), ignore_index=True)
+    with pytest.raises(TypeError):
+        loaded.bulk_load(frame)
+    with pytest.raises(TypeError):
+        loaded.clear()
+    assert len(pd.concat(loaded.stream_rows(4))) == VALID_LISTINGS